@@ -1,11 +1,11 @@
 import streamlit as st
-from database.in_memory_db import InMemoryDB
+from database.in_memory_db import PHASES, STRUCTURE_NAMES
+from database.shared_db import SharedDB
 import plotly.graph_objects as go
 import time
 import pandas as pd
-import csv
-import io
-import base64
+import os
+import tempfile
 
 # Page configuration
 # st.set_page_config(
@@ -19,9 +19,14 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Initialize the database in session state
-if 'db' not in st.session_state:
-    st.session_state.db = InMemoryDB()
+# One database engine per process, shared by every browser session: the WAL
+# is replayed once and writes from all sessions go through its writer queue
+@st.cache_resource
+def get_shared_db():
+    return SharedDB()
+
+
+db = get_shared_db()
     
 #  Title with custom styling and debug information
 st.markdown("<h1 style='text-align: center; color: #FF4B4B;'> Custom In-Memory Database Explorer</h1>", unsafe_allow_html=True)
@@ -31,11 +36,7 @@ tab1 = st.tabs(["🗄️ Data Visualizer"])[0]
 
 with tab1:
     # Map selection to internal names
-    structure_map = {
-        "B+ Tree": "btree",
-        "AVL Tree": "avl",
-        "Skip List": "skip_list"
-    }
+    structure_map = {display_name: name for name, display_name in STRUCTURE_NAMES.items()}
 
     st.sidebar.title("Data Structures")
 
@@ -60,22 +61,51 @@ with tab1:
         - Multiple layers for fast search
         - Simple implementation
         - Efficient insertion/deletion
+        """,
+        "LSM Tree": """
+        🪵 **LSM Tree**
+        - Write-optimized log-structured merge tree
+        - Writes land in a small in-memory memtable
+        - Flushed into immutable sorted runs
+        - Background compaction with per-run Bloom filters
+        """,
+        "Adaptive Radix Tree": """
+        🔤 **Adaptive Radix Tree**
+        - Trie over the bytes of each key
+        - Nodes grow from 4 to 16, 48 or 256 children
+        - Shared prefixes are stored once
+        - Lookup cost depends on key length, not data size
+        """,
+        "Frozen Sorted Array": """
+        🧊 **Frozen Sorted Array**
+        - Read-optimized index for mostly static data
+        - Contiguous sorted key and value arrays
+        - Binary search lookups, slicing for ranges
+        - Writes go to a small delta until the next freeze
         """
     }
 
+    # New sessions start on the structure the shared engine is already using
     structure = st.sidebar.selectbox(
         "Select Index Structure",
-        ["B+ Tree", "AVL Tree", "Skip List"]
+        list(structure_map),
+        index=list(structure_map).index(STRUCTURE_NAMES[db.current_structure])
     )
 
     st.sidebar.markdown(data_structure_info[structure])
 
+    if db.current_structure == "frozen" and db.frozen_index.delta:
+        st.sidebar.caption(f"{len(db.frozen_index.delta)} writes waiting in the delta")
+        if st.sidebar.button("Merge Delta (Re-freeze)"):
+            db.freeze()
+            st.rerun()
+
     # Add visualization section after structure selection
     st.sidebar.markdown("---")
     st.sidebar.subheader("Structure Visualization")
 
     # Get current visualization
-    current_viz = st.session_state.db.get_current_visualization()
+    current_viz = db.get_current_visualization()
     if current_viz:
         st.sidebar.graphviz_chart(current_viz)
     else:
@@ -88,7 +118,7 @@ with tab1:
 
     if st.session_state.previous_structure != structure:
         try:
-            source_viz, target_viz = st.session_state.db.set_structure(structure_map[structure])
+            source_viz, target_viz = db.set_structure(structure_map[structure])
 
             if source_viz and target_viz:
                 st.markdown("### Data Structure Transformation")
@@ -107,11 +137,10 @@ with tab1:
         # Update the previous structure regardless
         st.session_state.previous_structure = structure
 
-    st.session_state.db.set_structure(structure_map[structure])
-
-    # Show current visualization
-    st.header(f"Current Data Structure: {structure}")
-    current_viz = st.session_state.db.get_current_visualization()
+    # The engine is shared, so it is only switched when this session's selection
+    # changes; another session may have switched it since
+    st.header(f"Current Data Structure: {STRUCTURE_NAMES[db.current_structure]}")
+    current_viz = db.get_current_visualization()
     if current_viz:
         st.graphviz_chart(current_viz, use_container_width=True)
     else:
@@ -139,25 +168,25 @@ with tab1:
             execution_time = 0
 
             if operation == "Insert" and value:
-                st.session_state.db.insert(key, value)
+                db.insert(key, value)
                 result_msg = f"Inserted key {key} with value {value}"
                 success = True
             elif operation == "Update":
-                if value and st.session_state.db.update(key, value):
+                if value and db.update(key, value):
                     result_msg = f"Updated key {key} with new value {value}"
                     success = True
                 else:
                     result_msg = f"Key {key} not found"
                     success = False
             elif operation == "Delete":
-                if st.session_state.db.delete(key):
+                if db.delete(key):
                     result_msg = f"Deleted key {key}"
                     success = True
                 else:
                     result_msg = f"Key {key} not found"
                     success = False
             elif operation == "Search":
-                result = st.session_state.db.search(key)
+                result = db.search(key)
                 if result:
                     result_msg = f"Found value: {result}"
                     success = True
@@ -177,8 +206,8 @@ with tab1:
             # Update visualization after operation - use safer approach than rerun
             if success:
                 # Update the main visualization without full rerun
-                st.header(f"Current Data Structure: {structure} (Updated)")
-                updated_viz = st.session_state.db.get_current_visualization()
+                st.header(f"Current Data Structure: {STRUCTURE_NAMES[db.current_structure]} (Updated)")
+                updated_viz = db.get_current_visualization()
                 if updated_viz:
                     st.graphviz_chart(updated_viz, use_container_width=True)
                 else:
@@ -191,16 +220,22 @@ with tab1:
     uploaded_file = st.file_uploader("Choose a CSV file", type="csv")
     if uploaded_file is not None:
         try:
-            df = pd.read_csv(uploaded_file)
+            preview_df = pd.read_csv(uploaded_file, nrows=5)
+            uploaded_file.seek(0)
             st.write("Preview of uploaded data:")
-            st.dataframe(df.head())
+            st.dataframe(preview_df)
 
             if st.button("Import to Database"):
-                for idx, row in df.iterrows():
-                    # Use the first column as key and the rest as JSON value
-                    key = str(row.iloc[0])
-                    value = row.iloc[1:].to_json()
-                    st.session_state.db.insert(key, value)
+                progress_bar = st.progress(0.0, text="Importing...")
+
+                def report_progress(rows_imported, fraction):
+                    progress_bar.progress(fraction or 0.0, text=f"Imported {rows_imported:,} rows")
+
+                # Use the first column as key and the rest as JSON value
+                rows_imported = db.import_csv(
+                    uploaded_file, chunksize=10000, progress_callback=report_progress
+                )
+                progress_bar.progress(1.0, text=f"Imported {rows_imported:,} rows")
                 st.success("✅ CSV data imported successfully!")
                 st.rerun()
         except Exception as e:
@@ -210,33 +245,61 @@ with tab1:
     st.markdown("---")
     st.header("Database Content")
 
-    # Get all key-value pairs from the database
-    all_data = st.session_state.db.get_all_data()
+    # Page through the ordered index instead of loading every key-value pair
+    if 'page_cursors' not in st.session_state:
+        st.session_state.page_cursors = [None]
 
-    # Create a DataFrame for the data table
-    if all_data:
-        # Convert data to DataFrame with explicit string conversion for keys
-        df = pd.DataFrame([(str(k), v) for k, v in all_data], columns=['Key', 'Value'])
+    page_size = st.selectbox("Rows per page", [25, 50, 100, 500], index=1)
+    page_items, next_cursor = db.page(st.session_state.page_cursors[-1], page_size)
+
+    # Create a DataFrame for the current page only
+    if page_items:
+        df = pd.DataFrame(page_items, columns=['Key', 'Value'])
         st.dataframe(df, use_container_width=True)
 
-        # Create a download button for CSV
-        csv_buffer = io.StringIO()
-        df.to_csv(csv_buffer, index=False)
-        csv_str = csv_buffer.getvalue()
+        page_number = len(st.session_state.page_cursors)
+        nav1, nav2, nav3 = st.columns([1, 2, 1])
+        with nav1:
+            if st.button("◀ Previous", disabled=page_number == 1):
+                st.session_state.page_cursors.pop()
+                st.rerun()
+        with nav2:
+            st.markdown(f"<p style='text-align: center;'>Page {page_number} · {len(db.data):,} keys</p>", unsafe_allow_html=True)
+        with nav3:
+            if st.button("Next ▶", disabled=next_cursor is None):
+                st.session_state.page_cursors.append(next_cursor)
+                st.rerun()
 
         col1, col2 = st.columns(2)
         with col1:
-            # Create a download button
-            st.download_button(
-                label="Download Data as CSV",
-                data=csv_str,
-                file_name=f"database_export_{time.strftime('%Y%m%d_%H%M%S')}.csv",
-                mime="text/csv",
-            )
+            export_format = st.radio("Export format", ["CSV", "JSON Lines"], horizontal=True)
+            fmt, extension, mime = ("csv", "csv", "text/csv") if export_format == "CSV" else ("jsonl", "jsonl", "application/jsonl")
+
+            # The export is only written when requested, chunk by chunk into a temporary file
+            if st.button("Prepare Export"):
+                export_fd, export_path = tempfile.mkstemp(suffix=f".{extension}")
+                with open(export_fd, "w", encoding="utf-8", newline="") as text_stream:
+                    db.export(text_stream, fmt=fmt)
+                try:
+                    # The download button reads the file's contents when it is created
+                    with open(export_path, "rb") as export_file:
+                        st.download_button(
+                            label=f"Download Data as {export_format}",
+                            data=export_file,
+                            file_name=f"database_export_{time.strftime('%Y%m%d_%H%M%S')}.{extension}",
+                            mime=mime,
+                        )
+                finally:
+                    os.remove(export_path)
         with col2:
             if st.button("Clear Database", type="primary"):
-                st.session_state.db.clear()
+                db.clear()
+                st.session_state.page_cursors = [None]
                 st.rerun()
+    elif len(st.session_state.page_cursors) > 1:
+        # The page we were on no longer exists (e.g. after deletes); start over
+        st.session_state.page_cursors = [None]
+        st.rerun()
     else:
         st.info("No data in the database yet. Insert some key-value pairs to see them here.")
 
@@ -246,14 +309,14 @@ with tab1:
     st.header("Search Performance Comparison")
 
     # Check if all structures have been tested for search operations
-    best_search_structure = st.session_state.db.get_best_search_structure()
+    best_search_structure = db.get_best_search_structure()
 
     if best_search_structure:
         # All structures have been tested for searching
         st.success(f"🔍 **Based on search performance analysis, the {best_search_structure} is the fastest structure for your search operations!**")
 
         # Get search performance metrics for all structures
-        metrics = st.session_state.db.get_performance_metrics()
+        metrics = db.get_performance_metrics()
 
         # Create a comparison table
         search_data = []
@@ -261,7 +324,7 @@ with tab1:
             if structure_metrics["search"]:
                 avg_time = sum(structure_metrics["search"]) / len(structure_metrics["search"])
                 search_count = len(structure_metrics["search"])
-                structure_display_name = {"btree": "B+ Tree", "avl": "AVL Tree", "skip_list": "Skip List"}[structure_name]
+                structure_display_name = STRUCTURE_NAMES[structure_name]
                 search_data.append({
                     "Structure": structure_display_name,
                     "Average Search Time (ms)": f"{avg_time:.3f}",
@@ -274,18 +337,40 @@ with tab1:
     else:
         # Not all structures have been tested for searching
         # Check which structures have been used for searching
-        metrics = st.session_state.db.get_performance_metrics()
+        metrics = db.get_performance_metrics()
 
         structures_with_search = []
         for structure_name, structure_metrics in metrics.items():
             if structure_metrics["search"]:
-                structures_with_search.append({"btree": "B+ Tree", "avl": "AVL Tree", "skip_list": "Skip List"}[structure_name])
+                structures_with_search.append(STRUCTURE_NAMES[structure_name])
 
         if structures_with_search:
-            remaining = set(["B+ Tree", "AVL Tree", "Skip List"]) - set(structures_with_search)
-            st.info(f"🔍 Search comparison is available after using all three structures for search operations. Structures tested so far: {', '.join(structures_with_search)}. Remaining: {', '.join(remaining)}")
+            remaining = set(STRUCTURE_NAMES.values()) - set(structures_with_search)
+            st.info(f"🔍 Search comparison is available after using all structures for search operations. Structures tested so far: {', '.join(structures_with_search)}. Remaining: {', '.join(remaining)}")
         else:
-            st.info("🔍 Perform search operations on all three data structures to see which one performs best.")
+            st.info("🔍 Perform search operations on all data structures to see which one performs best.")
+
+    # Break each operation's latency down into its phases, including the WAL fsync
+    st.markdown("---")
+    st.header("Latency Breakdown by Phase")
+
+    phase_breakdown = db.get_phase_breakdown()
+    if phase_breakdown:
+        structure_display_names = STRUCTURE_NAMES
+        bar_labels = []
+        bar_rows = []
+        for structure_name, operations in phase_breakdown.items():
+            for operation_name, averages in operations.items():
+                bar_labels.append(f"{structure_display_names.get(structure_name, structure_name)} · {operation_name} (n={averages['count']})")
+                bar_rows.append(averages)
+
+        phase_fig = go.Figure()
+        for phase in PHASES:
+            phase_fig.add_trace(go.Bar(name=phase, x=bar_labels, y=[row[phase] for row in bar_rows]))
+        phase_fig.update_layout(barmode="stack", yaxis_title="Average time (ms)", legend_title="Phase")
+        st.plotly_chart(phase_fig, use_container_width=True)
+    else:
+        st.info("⏱️ Run some operations to see where the time goes.")
 
     # Custom CSS
     st.markdown("""
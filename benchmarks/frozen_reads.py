@@ -0,0 +1,71 @@
+"""Compare read throughput and memory per key of the frozen index against the node-based structures.
+
+The frozen index keeps keys and values in two contiguous sorted lists, so
+a lookup is one C-level binary search and there are no per-key node
+objects to allocate. bytes/key counts only what the index itself
+allocates; the key and value strings are shared by every structure.
+
+Run from the repository root:
+    python -m benchmarks.frozen_reads --keys 200000
+"""
+import argparse
+import random
+import time
+import tracemalloc
+
+from data_structures.btree import BPlusTree
+from data_structures.avl_tree import AVLTree
+from data_structures.skip_list import SkipList
+from data_structures.radix_tree import AdaptiveRadixTree
+from data_structures.frozen_index import FrozenIndex
+
+
+def build(factory, items):
+    """Bulk load a structure, returning it and the bytes it allocated"""
+    tracemalloc.start()
+    structure = factory()
+    structure.bulk_load(items)
+    allocated = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return structure, allocated
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--keys", type=int, default=200000)
+    parser.add_argument("--lookups", type=int, default=100000)
+    parser.add_argument("--scan", type=int, default=1000, help="keys per range scan")
+    args = parser.parse_args()
+
+    items = sorted({f"{random.getrandbits(40):012d}": "value" for _ in range(args.keys)}.items())
+    lookups = [key for key, _ in random.choices(items, k=args.lookups)]
+    scan_starts = [key for key, _ in random.choices(items, k=200)]
+
+    factories = {
+        "btree": lambda: BPlusTree(order=4),
+        "avl": AVLTree,
+        "skip_list": SkipList,
+        "art": AdaptiveRadixTree,
+        "frozen": FrozenIndex,
+    }
+    print(f"{'structure':<10} {'searches/s':>12} {'scanned keys/s':>15} {'bytes/key':>10}")
+    for name, factory in factories.items():
+        structure, allocated = build(factory, items)
+
+        start = time.perf_counter()
+        for key in lookups:
+            structure.search(key)
+        search_rate = len(lookups) / (time.perf_counter() - start)
+
+        scanned = 0
+        start = time.perf_counter()
+        for key in scan_starts:
+            for _ in zip(range(args.scan), structure.range_query(key)):
+                scanned += 1
+        scan_rate = scanned / (time.perf_counter() - start)
+
+        print(f"{name:<10} {search_rate:>12,.0f} {scan_rate:>15,.0f} {allocated / len(items):>10,.0f}")
+
+
+if __name__ == "__main__":
+    main()
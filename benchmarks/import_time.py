@@ -0,0 +1,90 @@
+"""Check that the core engine imports quickly and without the UI stack.
+
+Runs `python -X importtime` in a fresh interpreter for each core module.
+The gate is the module's own time: its cumulative import time minus the
+standard library modules it pulls in, which every Python process shares
+and whose cost mostly tracks how busy the machine is. The script fails
+(exit status 1) if the best-of-N own time exceeds that module's budget,
+or if a UI/data-science package was imported along the way. The standard library share is printed for
+reference.
+
+Run from the repository root:
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --budget-ms 40   # one budget for every module
+"""
+import argparse
+import subprocess
+import sys
+
+# Budgets for each module's own import time in ms, at least twice the
+# slowest best-of-5 seen on a busy 1-CPU container (in_memory_db and
+# replication 26-45 ms, sharded_db 2-4 ms) so machine noise cannot trip them
+CORE_MODULES = {
+    "database.in_memory_db": 80.0,
+    "database.sharded_db": 15.0,
+    "database.replication": 80.0,
+}
+
+# Packages the engine must only load lazily, when a feature actually needs them
+FORBIDDEN_PACKAGES = {"streamlit", "graphviz", "plotly", "pandas", "numpy"}
+
+
+def measure(module):
+    """
+    Return (own ms, standard library ms, set of top-level packages imported)
+    for importing module, where own ms is its cumulative time minus the
+    standard library modules imported beneath it.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True
+    )
+    # (self us, cumulative us, depth, name), children listed before their parent
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative, name = line[len("import time:"):].split("|")
+        if not self_us.strip().isdigit():
+            continue
+        depth = (len(name) - len(name.lstrip())) // 2
+        entries.append((int(self_us), int(cumulative), depth, name.strip()))
+
+    packages = {name.split(".")[0] for _, _, _, name in entries}
+    index = next(i for i, entry in enumerate(entries) if entry[3] == module)
+    _, cumulative_us, depth, _ = entries[index]
+    stdlib_us = 0
+    i = index - 1
+    while i >= 0 and entries[i][2] > depth:
+        top = entries[i][3].split(".")[0]
+        if top in sys.stdlib_module_names:
+            stdlib_us += entries[i][0]
+        i -= 1
+    return (cumulative_us - stdlib_us) / 1000, stdlib_us / 1000, packages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-ms", type=float, default=None, help="override every module's own-time budget")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    failed = False
+    print(f"{'module':<28} {'own ms':>8} {'stdlib ms':>10} {'budget':>8}")
+    for module, budget in CORE_MODULES.items():
+        budget = args.budget_ms if args.budget_ms is not None else budget
+        runs = [measure(module) for _ in range(args.runs)]
+        own, stdlib, packages = min(runs, key=lambda run: run[0])
+        status = "ok" if own <= budget else "OVER BUDGET"
+        print(f"{module:<28} {own:>8.1f} {stdlib:>10.1f} {budget:>8.1f}  {status}")
+
+        leaked = packages & FORBIDDEN_PACKAGES
+        if leaked:
+            print(f"  {module} imports {', '.join(sorted(leaked))} at import time")
+        failed = failed or own > budget or bool(leaked)
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
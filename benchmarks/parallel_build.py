@@ -0,0 +1,64 @@
+"""Measure index rebuild time with 1..N worker processes.
+
+Compares the old one-insert-per-key rebuild with the sorted bulk load, run
+serially and with the key-range partitions prepared in worker processes.
+
+Run from the repository root:
+    python -m benchmarks.parallel_build --keys 500000
+"""
+import argparse
+import os
+import random
+import time
+
+from data_structures.avl_tree import AVLTree
+from data_structures.btree import BPlusTree
+from data_structures.skip_list import SkipList
+from database.parallel_build import prepare_sorted_items
+
+STRUCTURES = {
+    "btree": lambda: BPlusTree(order=4),
+    "avl": AVLTree,
+    "skip_list": SkipList,
+}
+
+
+def rebuild(name, data, workers):
+    structure = STRUCTURES[name]()
+    skip_list_p = structure.p if name == "skip_list" else None
+    start = time.perf_counter()
+    items, levels = prepare_sorted_items(data, workers=workers, threshold=0, skip_list_p=skip_list_p)
+    if name == "skip_list":
+        structure.bulk_load(items, levels)
+    else:
+        structure.bulk_load(items)
+    return time.perf_counter() - start
+
+
+def rebuild_by_insert(name, data):
+    structure = STRUCTURES[name]()
+    start = time.perf_counter()
+    for key, value in data.items():
+        structure.insert(key, value)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--keys", type=int, default=500000)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    data = {f"{random.getrandbits(40):012d}": "value" for _ in range(args.keys)}
+
+    print(f"{'structure':<10} {'method':<18} {'seconds':>8} {'speedup':>8}")
+    for name in STRUCTURES:
+        baseline = rebuild_by_insert(name, data)
+        print(f"{name:<10} {'insert per key':<18} {baseline:>8.2f} {1.0:>8.2f}")
+        for workers in range(1, args.max_workers + 1):
+            elapsed = rebuild(name, data, workers)
+            print(f"{name:<10} {f'bulk, {workers} worker(s)':<18} {elapsed:>8.2f} {baseline / elapsed:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
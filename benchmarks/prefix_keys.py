@@ -0,0 +1,54 @@
+"""Compare lookup throughput for keys that share long prefixes.
+
+Comparison-based indexes re-compare the shared prefix at every level,
+while the adaptive radix tree stores it once and spends one step per
+distinguishing byte, so its lookups should slow down less as the data
+grows. Compare runs at a few --keys sizes.
+
+Run from the repository root:
+    python -m benchmarks.prefix_keys --keys 100000
+"""
+import argparse
+import random
+import time
+
+from data_structures.btree import BPlusTree
+from data_structures.avl_tree import AVLTree
+from data_structures.skip_list import SkipList
+from data_structures.radix_tree import AdaptiveRadixTree
+
+
+def build(factory, items):
+    structure = factory()
+    structure.bulk_load(items)
+    return structure
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--keys", type=int, default=100000)
+    parser.add_argument("--lookups", type=int, default=50000)
+    args = parser.parse_args()
+
+    prefix = "tenant-0042/region-eu-west-1/customer/"
+    items = sorted((f"{prefix}{random.getrandbits(32):010d}", "value") for _ in range(args.keys))
+    lookups = [key for key, _ in random.sample(items, min(args.lookups, len(items)))]
+
+    factories = {
+        "btree": lambda: BPlusTree(order=4),
+        "avl": AVLTree,
+        "skip_list": SkipList,
+        "art": AdaptiveRadixTree,
+    }
+    print(f"{'structure':<10} {'searches/s':>12}")
+    for name, factory in factories.items():
+        structure = build(factory, items)
+        start = time.perf_counter()
+        for key in lookups:
+            structure.search(key)
+        rate = len(lookups) / (time.perf_counter() - start)
+        print(f"{name:<10} {rate:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Measure ShardedDB insert and lookup throughput for 1..N shards.
+
+Run from the repository root. The shard workers log every operation to
+stdout, so the results table is written to stderr:
+    python -m benchmarks.sharded_throughput --keys 20000 > /dev/null
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+
+from database.sharded_db import ShardedDB
+
+
+def run(num_shards, items, batch_size):
+    with tempfile.TemporaryDirectory() as tmp:
+        with ShardedDB(num_shards=num_shards, wal_prefix=os.path.join(tmp, "wal_shard")) as db:
+            start = time.perf_counter()
+            for i in range(0, len(items), batch_size):
+                db.insert_many(items[i:i + batch_size])
+            insert_time = time.perf_counter() - start
+
+            keys = [key for key, _ in items]
+            start = time.perf_counter()
+            for i in range(0, len(keys), batch_size):
+                db.execute_batch([("search", key) for key in keys[i:i + batch_size]])
+            search_time = time.perf_counter() - start
+    return len(items) / insert_time, len(items) / search_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--keys", type=int, default=20000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--max-shards", type=int, default=multiprocessing.cpu_count())
+    args = parser.parse_args()
+
+    items = [(f"key{i:08d}", str(i)) for i in range(args.keys)]
+    random.shuffle(items)
+
+    print(f"{'shards':>6} {'insert ops/s':>14} {'search ops/s':>14}", file=sys.stderr)
+    for num_shards in range(1, args.max_shards + 1):
+        insert_rate, search_rate = run(num_shards, items, args.batch_size)
+        print(f"{num_shards:>6} {insert_rate:>14,.0f} {search_rate:>14,.0f}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""Compare SkipList insert throughput for sequential, nearly-sorted and random keys.
+
+Sequential and nearly-sorted streams (timestamps, sequence IDs) should hit
+the finger/tail fast path; random keys pay the full top-down search.
+
+Run from the repository root:
+    python -m benchmarks.skip_list_inserts --keys 200000 --p 0.5
+"""
+import argparse
+import random
+import time
+
+from data_structures.skip_list import SkipList
+
+
+def key_streams(n):
+    sequential = [f"{i:010d}" for i in range(n)]
+    # Mostly ascending with small local reordering, like late-arriving events
+    nearly_sorted = [f"{max(i + random.randint(-50, 50), 0):010d}" for i in range(n)]
+    shuffled = sequential[:]
+    random.shuffle(shuffled)
+    return {"sequential": sequential, "nearly sorted": nearly_sorted, "random": shuffled}
+
+
+def run(keys, p):
+    skip_list = SkipList(p=p)
+    start = time.perf_counter()
+    for key in keys:
+        skip_list.insert(key, key)
+    elapsed = time.perf_counter() - start
+    return len(keys) / elapsed, skip_list
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--keys", type=int, default=200000)
+    parser.add_argument("--p", type=float, default=0.5)
+    args = parser.parse_args()
+
+    print(f"{'key order':<14} {'inserts/s':>12} {'level':>6} {'max_level':>10}")
+    for name, keys in key_streams(args.keys).items():
+        rate, skip_list = run(keys, args.p)
+        print(f"{name:<14} {rate:>12,.0f} {skip_list.level:>6} {skip_list.max_level:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Measure startup recovery time and peak memory from a segmented WAL.
+
+Writes --records inserts into a fresh WAL split into --segment-size byte
+segments, then recovers it with one worker and with --workers processes.
+Recovery streams segment by segment, so peak memory should track the
+segment size and worker count rather than the length of the log.
+
+Run from the repository root:
+    python -m benchmarks.wal_recovery --records 200000 --workers 4
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+from database.in_memory_db import InMemoryDB
+from database.wal import WAL
+
+
+def write_log(path, records, segment_size):
+    """Append insert records, rotating like WAL._append but without its per-record fsync"""
+    wal = WAL(path, segment_size=segment_size)
+    for i in range(records):
+        wal.sequence += 1
+        line = json.dumps({"seq": wal.sequence, "timestamp": "", "operation": "insert",
+                           "key": f"key{i:09d}", "value": str(i)}) + "\n"
+        with open(wal.filename, "a") as f:
+            f.write(line)
+            size = f.tell()
+        if size >= segment_size:
+            wal._rotate()
+    return len(wal.segments())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, default=200000)
+    parser.add_argument("--segment-size", type=int, default=1024 * 1024)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "wal.log")
+        segments = write_log(path, args.records, args.segment_size)
+        print(f"{args.records:,} records in {segments} segments")
+
+        print(f"{'workers':>8} {'seconds':>9} {'peak MB':>9}")
+        for workers in sorted({1, args.workers}):
+            tracemalloc.start()
+            start = time.perf_counter()
+            db = InMemoryDB(wal_filename=path, build_workers=workers)
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            assert len(db.data) == args.records
+            print(f"{workers:>8} {elapsed:>9.2f} {peak / 1e6:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
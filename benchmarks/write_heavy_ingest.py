@@ -0,0 +1,62 @@
+"""Compare insert and search throughput of every index on a write-heavy random ingest.
+
+The LSM tree inserts into a small memtable and merges sorted runs in the
+background, so its insert cost stays flat as the data grows, unlike the
+in-place B+ tree, while each lookup may have to probe several runs.
+
+Run from the repository root:
+    python -m benchmarks.write_heavy_ingest --keys 100000
+"""
+import argparse
+import random
+import time
+
+from data_structures.btree import BPlusTree
+from data_structures.avl_tree import AVLTree
+from data_structures.skip_list import SkipList
+from data_structures.lsm_tree import LSMTree
+
+
+def structures():
+    return {
+        "btree": lambda: BPlusTree(order=4),
+        "avl": AVLTree,
+        "skip_list": SkipList,
+        "lsm": LSMTree,
+    }
+
+
+def run(factory, keys, lookups):
+    structure = factory()
+    start = time.perf_counter()
+    for key in keys:
+        structure.insert(key, key)
+    if isinstance(structure, LSMTree):
+        structure.wait_for_compaction()
+    insert_rate = len(keys) / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for key in lookups:
+        structure.search(key)
+    search_rate = len(lookups) / (time.perf_counter() - start)
+    return insert_rate, search_rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--keys", type=int, default=100000)
+    parser.add_argument("--lookups", type=int, default=20000)
+    args = parser.parse_args()
+
+    keys = [f"{random.getrandbits(40):012d}" for _ in range(args.keys)]
+    # Half hits, half misses
+    lookups = random.sample(keys, args.lookups // 2) + [f"x{i}" for i in range(args.lookups // 2)]
+
+    print(f"{'structure':<10} {'inserts/s':>12} {'searches/s':>12}")
+    for name, factory in structures().items():
+        insert_rate, search_rate = run(factory, keys, lookups)
+        print(f"{name:<10} {insert_rate:>12,.0f} {search_rate:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,32 @@
+from data_structures.persistent import PersistentTree, next_epoch
+
 class AVLNode:
-    def __init__(self, key, value):
+    def __init__(self, key, value, epoch=0):
         self.key = key
         self.value = value
         self.left = None
         self.right = None
         self.height = 1
+        # Epoch of the tree that created this node; only that tree may modify it
+        self.epoch = epoch
 
-class AVLTree:
+class AVLTree(PersistentTree):
+    """AVL tree with path copying (see PersistentTree), so snapshot() is O(1)"""
     def __init__(self):
         self.root = None
+        self.epoch = next_epoch()
+        # Optional OpCounter; when set, operations tally their steps into it
+        self.counter = None
+
+    def _empty(self):
+        return AVLTree()
+
+    def _copy_node(self, node):
+        copy = AVLNode(node.key, node.value, self.epoch)
+        copy.left = node.left
+        copy.right = node.right
+        copy.height = node.height
+        return copy
         
     def height(self, node):
         if not node:
@@ -21,7 +39,9 @@ class AVLTree:
         return self.height(node.left) - self.height(node.right)
     
     def right_rotate(self, y):
-        x = y.left
+        if self.counter is not None:
+            self.counter.rotations += 1
+        x = self._writable(y.left)
         T2 = x.right
         x.right = y
         y.left = T2
@@ -30,7 +50,9 @@ class AVLTree:
         return x
     
     def left_rotate(self, x):
-        y = x.right
+        if self.counter is not None:
+            self.counter.rotations += 1
+        y = self._writable(x.right)
         T2 = y.left
         y.left = x
         x.right = T2
@@ -38,13 +60,36 @@ class AVLTree:
         y.height = max(self.height(y.left), self.height(y.right)) + 1
         return y
     
+    def bulk_load(self, items):
+        """Replace the tree contents with a perfectly balanced tree built from (key, value) pairs sorted by key"""
+        self.root = self._build_balanced(items, 0, len(items))
+
+    def _build_balanced(self, items, lo, hi):
+        if lo >= hi:
+            return None
+        mid = (lo + hi) // 2
+        key, value = items[mid]
+        node = AVLNode(key, value, self.epoch)
+        node.left = self._build_balanced(items, lo, mid)
+        node.right = self._build_balanced(items, mid + 1, hi)
+        node.height = max(self.height(node.left), self.height(node.right)) + 1
+        return node
+
     def insert(self, key, value):
         self.root = self._insert(self.root, key, value)
         
     def _insert(self, node, key, value):
         if not node:
-            return AVLNode(key, value)
-        
+            return AVLNode(key, value, self.epoch)
+
+        counter = self.counter
+        if counter is not None:
+            counter.nodes_visited += 1
+            counter.pointer_hops += 1
+            # key < node.key, then key > node.key unless the first one matched
+            counter.comparisons += 1 if key < node.key else 2
+
+        node = self._writable(node)
         if key < node.key:
             node.left = self._insert(node.left, key, value)
         elif key > node.key:
@@ -79,8 +124,32 @@ class AVLTree:
     def _search(self, node, key):
         if not node:
             return None
+        counter = self.counter
+        if counter is not None:
+            counter.nodes_visited += 1
+            counter.pointer_hops += 1
+            counter.comparisons += 1 if node.key == key else 2
         if node.key == key:
             return node.value
         if key < node.key:
             return self._search(node.left, key)
         return self._search(node.right, key)
+
+    def range_query(self, start_key=None, end_key=None):
+        """Yield (key, value) pairs with start_key <= key <= end_key in key order"""
+        stack = []
+        node = self.root
+        while stack or node:
+            if node:
+                # Skip left subtrees that lie entirely before start_key
+                if start_key is not None and node.key < start_key:
+                    node = node.right
+                    continue
+                stack.append(node)
+                node = node.left
+            else:
+                node = stack.pop()
+                if end_key is not None and node.key > end_key:
+                    return
+                yield node.key, node.value
+                node = node.right
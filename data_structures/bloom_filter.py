@@ -0,0 +1,75 @@
+import math
+
+class CountingBloomFilter:
+    """
+    Bloom filter with a small counter per slot instead of a single bit, so
+    keys can be removed again. might_contain() never returns False for a
+    key that was added and not removed; it returns True for an absent key
+    with probability close to fp_rate while no more than capacity keys are
+    stored.
+    """
+    MAX_COUNT = 255
+
+    def __init__(self, capacity, fp_rate=0.01):
+        if not 0 < fp_rate < 1:
+            raise ValueError("fp_rate must be between 0 and 1")
+        self.capacity = max(int(capacity), 1)
+        self.fp_rate = fp_rate
+        # Optimal slot count and hash count for the target false-positive rate
+        self.size = max(int(-self.capacity * math.log(fp_rate) / (math.log(2) ** 2)), 8)
+        self.hash_count = max(int(round(self.size / self.capacity * math.log(2))), 1)
+        self.counters = bytearray(self.size)
+        self.count = 0
+
+    @staticmethod
+    def hash_pair(key):
+        """
+        The two base hashes of a key. Python's string hash is salted per
+        process, which is fine because filters are never persisted; callers
+        probing several filters for one key can compute this once.
+        """
+        h = hash(str(key))
+        return h & 0xFFFFFFFF, ((h >> 32) & 0xFFFFFFFF) | 1
+
+    def _positions(self, hashes):
+        h1, h2 = hashes
+        size = self.size
+        # Double hashing: k positions from two independent hashes
+        return [(h1 + i * h2) % size for i in range(self.hash_count)]
+
+    def add(self, key):
+        counters = self.counters
+        for position in self._positions(self.hash_pair(key)):
+            if counters[position] < self.MAX_COUNT:
+                counters[position] += 1
+        self.count += 1
+
+    def update(self, keys):
+        """Add every key in an iterable"""
+        counters, size, hash_count, max_count = self.counters, self.size, self.hash_count, self.MAX_COUNT
+        added = 0
+        for key in keys:
+            h = hash(str(key))
+            h1, h2 = h & 0xFFFFFFFF, ((h >> 32) & 0xFFFFFFFF) | 1
+            for i in range(hash_count):
+                position = (h1 + i * h2) % size
+                if counters[position] < max_count:
+                    counters[position] += 1
+            added += 1
+        self.count += added
+
+    def remove(self, key):
+        """Remove a key that was previously added"""
+        for position in self._positions(self.hash_pair(key)):
+            # A saturated counter has lost track of how many keys it covers
+            if 0 < self.counters[position] < self.MAX_COUNT:
+                self.counters[position] -= 1
+        self.count = max(self.count - 1, 0)
+
+    def might_contain(self, key, hashes=None):
+        """hashes may pass a precomputed hash_pair(key)"""
+        counters = self.counters
+        return all(counters[position] for position in self._positions(hashes or self.hash_pair(key)))
+
+    def __contains__(self, key):
+        return self.might_contain(key)
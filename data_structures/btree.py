@@ -1,51 +1,129 @@
+from data_structures.persistent import PersistentTree, next_epoch
+
 class BPlusNode:
-    def __init__(self, leaf=True):
+    def __init__(self, leaf=True, epoch=0):
         self.leaf = leaf
         self.keys = []
         self.children = []
-        self.next = None
-
-class BPlusTree:
+        # Epoch of the tree that created this node; only that tree may modify it
+        self.epoch = epoch
+
+class BPlusTree(PersistentTree):
+    """
+    B+ tree with path copying (see PersistentTree), so snapshot() is O(1).
+    Leaves are not linked, as a copied leaf would leave its predecessor
+    pointing at the old version; range scans walk down from the root.
+    """
     def __init__(self, order):
-        self.root = BPlusNode()
+        self.epoch = next_epoch()
+        self.root = BPlusNode(epoch=self.epoch)
         self.order = order
+        # Optional OpCounter; when set, operations tally their steps into it
+        self.counter = None
+
+    def _empty(self):
+        return BPlusTree(self.order)
+
+    def _copy_node(self, node):
+        copy = BPlusNode(node.leaf, self.epoch)
+        copy.keys = list(node.keys)
+        copy.children = list(node.children)
+        return copy
+
+    def bulk_load(self, items):
+        """
+        Replace the tree contents with (key, value) pairs sorted by key,
+        building it bottom-up in linear time instead of inserting one by one.
+        """
+        self.root = BPlusNode(epoch=self.epoch)
+        if not items:
+            return
+
+        # Leave room for one more key per node before the next split
+        node_size = max(self.order - 1, 2)
+
+        level = []
+        for i in range(0, len(items), node_size):
+            leaf = BPlusNode(epoch=self.epoch)
+            leaf.keys = [(str(k), v) for k, v in items[i:i + node_size]]
+            level.append(leaf)
+        min_keys = [leaf.keys[0][0] for leaf in level]
+
+        # Build internal levels; each separator is the smallest key of its right subtree
+        while len(level) > 1:
+            parents, parent_min_keys = [], []
+            starts = list(range(0, len(level), node_size))
+            if len(starts) > 1 and len(level) - starts[-1] == 1:
+                # Fold a lone trailing child into the previous group
+                starts.pop()
+            for index, start in enumerate(starts):
+                end = starts[index + 1] if index + 1 < len(starts) else len(level)
+                parent = BPlusNode(leaf=False, epoch=self.epoch)
+                parent.children = level[start:end]
+                parent.keys = [(k, None) for k in min_keys[start + 1:end]]
+                parents.append(parent)
+                parent_min_keys.append(min_keys[start])
+            level, min_keys = parents, parent_min_keys
+
+        self.root = level[0]
 
     def insert(self, key, value):
         # Handle root split if needed
         if len(self.root.keys) == self.order:
             old_root = self.root
-            self.root = BPlusNode(leaf=False)
+            self.root = BPlusNode(leaf=False, epoch=self.epoch)
             self.root.children = [old_root]
             self._split_child(self.root, 0)
+        else:
+            self.root = self._writable(self.root)
 
         self._insert_non_full(self.root, key, value)
 
     def _insert_non_full(self, node, key, value):
         i = len(node.keys) - 1
         str_key = str(key)
+        counter = self.counter
 
         if node.leaf:
             # Insert into leaf node
             while i >= 0 and str_key < str(node.keys[i][0]):
                 i -= 1
-            node.keys.insert(i + 1, (str_key, value))
+            if counter is not None:
+                counter.nodes_visited += 1
+                # One comparison per step left, plus the one that stopped the scan
+                counter.comparisons += len(node.keys) - 1 - i + (1 if i >= 0 else 0)
+            if i >= 0 and node.keys[i][0] == str_key:
+                # Existing key: replace its value rather than adding a duplicate
+                node.keys[i] = (str_key, value)
+            else:
+                node.keys.insert(i + 1, (str_key, value))
         else:
             # Find the child to recurse to
             while i >= 0 and str(key) < str(node.keys[i][0]):
                 i -= 1
+            if counter is not None:
+                counter.nodes_visited += 1
+                counter.comparisons += len(node.keys) - 1 - i + (1 if i >= 0 else 0)
+                counter.pointer_hops += 1
             i += 1
 
             if len(node.children[i].keys) == self.order:
                 self._split_child(node, i)
-                if str(key) > str(node.keys[i][0]):
+                if counter is not None:
+                    counter.comparisons += 1
+                if str(key) >= str(node.keys[i][0]):
                     i += 1
 
+            node.children[i] = self._writable(node.children[i])
             self._insert_non_full(node.children[i], key, value)
 
     def _split_child(self, parent, child_index):
+        if self.counter is not None:
+            self.counter.splits += 1
         order = self.order
-        child = parent.children[child_index]
-        new_node = BPlusNode(leaf=child.leaf)
+        child = self._writable(parent.children[child_index])
+        parent.children[child_index] = child
+        new_node = BPlusNode(leaf=child.leaf, epoch=self.epoch)
 
         # Split differently for leaf and non-leaf nodes
         if child.leaf:
@@ -53,10 +131,6 @@ class BPlusTree:
             new_node.keys = child.keys[mid:]
             child.keys = child.keys[:mid]
 
-            # Update leaf node links
-            new_node.next = child.next
-            child.next = new_node
-
             # Copy up the first key of new node
             parent.keys.insert(child_index, (new_node.keys[0][0], None))
         else:
@@ -74,15 +148,54 @@ class BPlusTree:
 
     def search(self, key):
         str_key = str(key)
+        counter = self.counter
         node = self.root
         while not node.leaf:
             i = 0
             while i < len(node.keys) and str_key >= str(node.keys[i][0]):
                 i += 1
+            if counter is not None:
+                counter.nodes_visited += 1
+                counter.comparisons += i + (1 if i < len(node.keys) else 0)
+                counter.pointer_hops += 1
             node = node.children[i]
 
+        if counter is not None:
+            counter.nodes_visited += 1
+
         # Search within leaf node
-        for k, v in node.keys:
+        for position, (k, v) in enumerate(node.keys):
             if str(k) == str_key:
+                if counter is not None:
+                    counter.comparisons += position + 1
                 return v
-        return None
\ No newline at end of file
+        if counter is not None:
+            counter.comparisons += len(node.keys)
+        return None
+
+    def range_query(self, start_key=None, end_key=None):
+        """Yield (key, value) pairs with start_key <= key <= end_key in key order"""
+        start_key = str(start_key) if start_key is not None else None
+        end_key = str(end_key) if end_key is not None else None
+
+        # Depth-first descent that only visits children overlapping the range
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            if node.leaf:
+                for k, v in node.keys:
+                    if start_key is not None and k < start_key:
+                        continue
+                    if end_key is not None and k > end_key:
+                        return
+                    yield k, v
+                continue
+
+            first, last = 0, len(node.children) - 1
+            if start_key is not None:
+                while first < len(node.keys) and start_key >= str(node.keys[first][0]):
+                    first += 1
+            if end_key is not None:
+                while last > 0 and end_key < str(node.keys[last - 1][0]):
+                    last -= 1
+            stack.extend(reversed(node.children[first:last + 1]))
@@ -0,0 +1,103 @@
+import bisect
+
+# Delta value recording that a frozen key was deleted
+_TOMBSTONE = object()
+
+
+class FrozenIndex:
+    """
+    Read-optimized index for mostly static data: the keys and values sit
+    in two contiguous sorted lists, so a lookup is one binary search and a
+    range scan is a slice, with no per-key node objects.
+
+    Writes after the freeze go to a small delta (deletes as tombstones)
+    that shadows the arrays until merged() folds it in.
+    """
+    SCAN_CHUNK = 1024
+
+    def __init__(self):
+        self.keys = []
+        self.values = []
+        self.delta = {}
+        # Sorted delta keys for range scans, rebuilt after a write
+        self._delta_keys = None
+        # Optional OpCounter; when set, operations tally their steps into it
+        self.counter = None
+
+    def bulk_load(self, items):
+        """Replace the index contents with (key, value) pairs sorted by key"""
+        self.keys = [k for k, _ in items]
+        self.values = [v for _, v in items]
+        self.delta = {}
+        self._delta_keys = None
+
+    def insert(self, key, value):
+        self.delta[key] = value
+        self._delta_keys = None
+
+    def delete(self, key):
+        self.insert(key, _TOMBSTONE)
+
+    def search(self, key):
+        counter = self.counter
+        if counter is not None:
+            counter.nodes_visited += 1
+            counter.comparisons += 1
+        value = self.delta.get(key)
+        if value is not None:
+            return None if value is _TOMBSTONE else value
+
+        keys = self.keys
+        i = bisect.bisect_left(keys, key)
+        if counter is not None:
+            counter.comparisons += max(len(keys), 1).bit_length() + 1
+        if i < len(keys) and keys[i] == key:
+            return self.values[i]
+        return None
+
+    def range_query(self, start_key=None, end_key=None):
+        """Yield (key, value) pairs with start_key <= key <= end_key in key order"""
+        keys = self.keys
+        lo = bisect.bisect_left(keys, start_key) if start_key is not None else 0
+        hi = bisect.bisect_right(keys, end_key) if end_key is not None else len(keys)
+        if not self.delta:
+            # Slice in chunks so a short scan does not copy the rest of the arrays
+            for chunk in range(lo, hi, self.SCAN_CHUNK):
+                end = min(chunk + self.SCAN_CHUNK, hi)
+                yield from zip(keys[chunk:end], self.values[chunk:end])
+            return
+
+        if self._delta_keys is None:
+            self._delta_keys = sorted(self.delta)
+        delta_keys = self._delta_keys
+        d = bisect.bisect_left(delta_keys, start_key) if start_key is not None else 0
+        d_end = bisect.bisect_right(delta_keys, end_key) if end_key is not None else len(delta_keys)
+
+        # Merge the array slice with the delta; delta entries shadow array entries
+        i = lo
+        while i < hi or d < d_end:
+            if d < d_end and (i >= hi or delta_keys[d] <= keys[i]):
+                key = delta_keys[d]
+                if i < hi and keys[i] == key:
+                    i += 1
+                d += 1
+                value = self.delta[key]
+                if value is not _TOMBSTONE:
+                    yield key, value
+            else:
+                yield keys[i], self.values[i]
+                i += 1
+
+    def merged(self):
+        """Return a new index with the delta folded into the arrays, in linear time"""
+        index = FrozenIndex()
+        index.bulk_load(list(self.range_query()))
+        return index
+
+    def snapshot(self):
+        """Return an independent index sharing the arrays, which are never modified in place"""
+        view = FrozenIndex()
+        view.keys = self.keys
+        view.values = self.values
+        view.delta = dict(self.delta)
+        return view
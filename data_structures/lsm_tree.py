@@ -0,0 +1,230 @@
+import bisect
+import heapq
+import math
+import threading
+
+from data_structures.skip_list import SkipList
+from data_structures.bloom_filter import CountingBloomFilter
+
+# Value written for a deleted key until compaction into the oldest run drops it
+_TOMBSTONE = object()
+
+
+class SortedRun:
+    """Immutable sorted run: parallel key and value lists plus a Bloom filter over the keys"""
+    SCAN_CHUNK = 1024
+
+    def __init__(self, items, bloom_fp_rate=0.01):
+        self.keys = [k for k, _ in items]
+        self.values = [v for _, v in items]
+        self.bloom = CountingBloomFilter(len(self.keys), bloom_fp_rate)
+        self.bloom.update(self.keys)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def find(self, key):
+        """Return the position of key, or None when the run does not hold it"""
+        i = bisect.bisect_left(self.keys, key)
+        if i < len(self.keys) and self.keys[i] == key:
+            return i
+        return None
+
+    def items(self, start_key=None, end_key=None):
+        """Yield (key, value) pairs in the range, slicing in chunks so a short scan copies little"""
+        keys = self.keys
+        lo = bisect.bisect_left(keys, start_key) if start_key is not None else 0
+        hi = bisect.bisect_right(keys, end_key) if end_key is not None else len(keys)
+        for chunk in range(lo, hi, self.SCAN_CHUNK):
+            end = min(chunk + self.SCAN_CHUNK, hi)
+            yield from zip(keys[chunk:end], self.values[chunk:end])
+
+
+class LSMTree:
+    """
+    Log-structured merge tree. Writes go to a small skip list memtable;
+    when it holds memtable_size keys it is frozen into an immutable sorted
+    run. Runs are kept newest first and merged by size-tiered compaction:
+    once tier_fanout adjacent runs fall in the same size tier they are
+    merged into one run of the next tier, on a background thread unless
+    background is False.
+
+    Lookups check the memtable and then each run, newest first, skipping
+    runs whose Bloom filter rules the key out. Deletes write tombstones.
+    """
+
+    def __init__(self, memtable_size=1024, tier_fanout=4, bloom_fp_rate=0.01, background=True):
+        self.memtable_size = memtable_size
+        self.tier_fanout = tier_fanout
+        self.bloom_fp_rate = bloom_fp_rate
+        self.background = background
+        self.memtable = SkipList()
+        # Newest first; replaced as a whole, never modified, so readers can hold a reference
+        self.runs = []
+        self.flushes = 0
+        self.compactions = 0
+        self._lock = threading.Lock()
+        self._compactor = None
+        self._compaction_pending = False
+        # Optional OpCounter; when set, operations tally their steps into it
+        self.counter = None
+
+    def bulk_load(self, items):
+        """Replace the tree contents with (key, value) pairs sorted by key, as a single run"""
+        self.memtable = SkipList()
+        self.runs = [SortedRun(items, self.bloom_fp_rate)] if items else []
+
+    def insert(self, key, value):
+        self.memtable.counter = self.counter
+        self.memtable.insert(key, value)
+        if self.memtable.size >= self.memtable_size:
+            self.flush()
+
+    def delete(self, key):
+        self.insert(key, _TOMBSTONE)
+
+    def flush(self):
+        """Freeze the memtable into a new sorted run"""
+        if self.memtable.size == 0:
+            return
+        run = SortedRun(list(self.memtable.range_query()), self.bloom_fp_rate)
+        # Publish the run before dropping the memtable so readers never miss its keys
+        with self._lock:
+            self.runs = [run] + self.runs
+            self._compaction_pending = True
+        self.memtable = SkipList()
+        self.flushes += 1
+
+        if not self.background:
+            self.compact()
+            return
+        with self._lock:
+            if self._compactor is None:
+                self._compactor = threading.Thread(target=self._compact_in_background, daemon=True)
+                self._compactor.start()
+
+    def _compact_in_background(self):
+        while True:
+            with self._lock:
+                self._compaction_pending = False
+            self.compact()
+            with self._lock:
+                # Stop unless a flush arrived while the last pass was running
+                if not self._compaction_pending:
+                    self._compactor = None
+                    return
+
+    def _tier(self, run):
+        return int(math.log(max(len(run) / self.memtable_size, 1), self.tier_fanout))
+
+    def _pick_compaction(self, runs):
+        """
+        Return (start, end) of the runs to merge next, or None. Tiers must not
+        decrease from newest to oldest: a run above an older run of a lower
+        tier (left behind when a compaction overlapped flushes) is merged
+        with the lower-tier runs after it. Otherwise the oldest tier_fanout
+        runs of the first tier holding that many are merged into one run of
+        the next tier, which then sits just above the older, higher tiers.
+        """
+        tiers = [self._tier(run) for run in runs]
+        for i in range(len(runs) - 1):
+            if tiers[i] > tiers[i + 1]:
+                end = i + 1
+                while end < len(runs) and tiers[end] < tiers[i]:
+                    end += 1
+                return i, end
+
+        start = 0
+        for i in range(1, len(runs) + 1):
+            if i == len(runs) or tiers[i] != tiers[start]:
+                if i - start >= self.tier_fanout:
+                    return i - self.tier_fanout, i
+                start = i
+        return None
+
+    def compact(self):
+        """Merge runs until tiers are in order and none holds tier_fanout runs"""
+        while True:
+            runs = self.runs
+            group = self._pick_compaction(runs)
+            if group is None:
+                return
+            start, end = group
+            merged = SortedRun(self._merge_runs(runs[start:end], drop_tombstones=end == len(runs)), self.bloom_fp_rate)
+            with self._lock:
+                # Flushes only prepend, so the merged runs have moved down by the number of new runs
+                offset = len(self.runs) - len(runs)
+                self.runs = self.runs[:start + offset] + [merged] + self.runs[end + offset:]
+            self.compactions += 1
+
+    def wait_for_compaction(self):
+        compactor = self._compactor
+        if compactor is not None:
+            compactor.join()
+
+    @staticmethod
+    def _merge_runs(runs, drop_tombstones=False):
+        """Merge whole runs given newest first into one sorted item list"""
+        # Newer runs overwrite older values; the dict then holds len(runs)
+        # ascending stretches of keys, which the sort merges in C
+        latest = {}
+        for run in reversed(runs):
+            latest.update(zip(run.keys, run.values))
+        items = sorted(latest.items(), key=lambda item: item[0])
+        if drop_tombstones:
+            # Tombstones can only be dropped once nothing older remains below them
+            items = [item for item in items if item[1] is not _TOMBSTONE]
+        return items
+
+    @staticmethod
+    def _merge(sources, drop_tombstones=False, start_key=None, end_key=None):
+        """Lazily merge (key, value) sources given newest first, keeping the newest value of each key"""
+        iterators = []
+        for age, source in enumerate(sources):
+            items = source.items(start_key, end_key) if isinstance(source, SortedRun) else source
+            iterators.append(((key, age, value) for key, value in items))
+
+        last_key = None
+        for key, _, value in heapq.merge(*iterators, key=lambda entry: (entry[0], entry[1])):
+            if key == last_key:
+                continue
+            last_key = key
+            if value is _TOMBSTONE and drop_tombstones:
+                continue
+            yield key, value
+
+    def search(self, key):
+        counter = self.counter
+        self.memtable.counter = counter
+        value = self.memtable.search(key)
+        if value is not None:
+            return None if value is _TOMBSTONE else value
+
+        hashes = CountingBloomFilter.hash_pair(key)
+        for run in self.runs:
+            if not run.bloom.might_contain(key, hashes):
+                continue
+            if counter is not None:
+                counter.nodes_visited += 1
+                counter.comparisons += max(len(run), 1).bit_length()
+            i = run.find(key)
+            if i is not None:
+                value = run.values[i]
+                return None if value is _TOMBSTONE else value
+        return None
+
+    def range_query(self, start_key=None, end_key=None):
+        """Yield (key, value) pairs with start_key <= key <= end_key in key order"""
+        sources = [list(self.memtable.range_query(start_key, end_key))] + self.runs
+        return self._merge(sources, True, start_key, end_key)
+
+    def snapshot(self):
+        """
+        Return an independent tree over the current contents. Runs are
+        immutable and shared; only the memtable, at most memtable_size keys,
+        is copied.
+        """
+        view = LSMTree(self.memtable_size, self.tier_fanout, self.bloom_fp_rate, background=False)
+        memtable_items = list(self.memtable.range_query())
+        view.runs = ([SortedRun(memtable_items, self.bloom_fp_rate)] if memtable_items else []) + self.runs
+        return view
@@ -0,0 +1,17 @@
+class OpCounter:
+    """
+    Tallies of the primitive steps an index performs, for hardware-independent
+    cost comparisons. Attach one to a structure's `counter` attribute to turn
+    counting on, and set it back to None to turn it off.
+    """
+    FIELDS = ("comparisons", "nodes_visited", "rotations", "splits", "pointer_hops")
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        for field in self.FIELDS:
+            setattr(self, field, 0)
+
+    def as_dict(self):
+        return {field: getattr(self, field) for field in self.FIELDS}
@@ -0,0 +1,34 @@
+import itertools
+
+# Every tree (and every snapshot of one) writes under its own epoch
+_epochs = itertools.count(1)
+
+
+def next_epoch():
+    return next(_epochs)
+
+
+class PersistentTree:
+    """
+    Base for trees with path copying. Each node records the epoch of the
+    tree that created it; a tree modifies only its own nodes in place and
+    copies any other node (via _copy_node) first. snapshot() therefore
+    shares the current root in O(1), and versions nobody references are
+    freed by ordinary garbage collection.
+
+    Subclasses set self.epoch = next_epoch() and self.root, and implement
+    _empty() and _copy_node(node).
+    """
+
+    def snapshot(self):
+        """Return an independent tree sharing all current nodes, in O(1)"""
+        view = self._empty()
+        view.root = self.root
+        # Both sides now copy shared nodes before modifying them
+        self.epoch = next_epoch()
+        return view
+
+    def _writable(self, node):
+        if node.epoch == self.epoch:
+            return node
+        return self._copy_node(node)
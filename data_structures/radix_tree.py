@@ -0,0 +1,334 @@
+import bisect
+import itertools
+
+
+class ARTLeaf:
+    def __init__(self, key, value):
+        self.key = key
+        # Keys are indexed by their UTF-8 bytes, whose order matches str order
+        self.key_bytes = key.encode("utf-8")
+        self.value = value
+
+
+class Node4:
+    """Inner node with up to 4 children, edge bytes kept sorted in a small list"""
+    capacity = 4
+
+    def __init__(self, prefix=b""):
+        # Compressed path: bytes shared by every key below this node
+        self.prefix = prefix
+        # Leaf for the key that ends exactly at this node, if any
+        self.terminal = None
+        self.edges = []
+        self.children = []
+
+    def find_child(self, byte):
+        for i, edge in enumerate(self.edges):
+            if edge == byte:
+                return self.children[i]
+        return None
+
+    def add_child(self, byte, child):
+        i = bisect.bisect_left(self.edges, byte)
+        if i < len(self.edges) and self.edges[i] == byte:
+            self.children[i] = child
+            return
+        self.edges.insert(i, byte)
+        self.children.insert(i, child)
+
+    def is_full(self):
+        return len(self.edges) >= self.capacity
+
+    def items(self):
+        return zip(self.edges, self.children)
+
+    def grow(self):
+        node = Node16(self.prefix) if self.capacity == 4 else Node48(self.prefix)
+        node.terminal = self.terminal
+        for byte, child in self.items():
+            node.add_child(byte, child)
+        return node
+
+
+class Node16(Node4):
+    """Inner node with up to 16 children, found by binary search over the sorted edge bytes"""
+    capacity = 16
+
+    def find_child(self, byte):
+        i = bisect.bisect_left(self.edges, byte)
+        if i < len(self.edges) and self.edges[i] == byte:
+            return self.children[i]
+        return None
+
+
+class Node48:
+    """Inner node with up to 48 children, reached through a 256-entry byte index"""
+    capacity = 48
+
+    def __init__(self, prefix=b""):
+        self.prefix = prefix
+        self.terminal = None
+        # index[byte] is the child's slot + 1, or 0 for no child
+        self.index = bytearray(256)
+        self.children = []
+
+    def find_child(self, byte):
+        slot = self.index[byte]
+        return self.children[slot - 1] if slot else None
+
+    def add_child(self, byte, child):
+        slot = self.index[byte]
+        if slot:
+            self.children[slot - 1] = child
+            return
+        self.children.append(child)
+        self.index[byte] = len(self.children)
+
+    def is_full(self):
+        return len(self.children) >= self.capacity
+
+    def items(self):
+        for byte in range(256):
+            slot = self.index[byte]
+            if slot:
+                yield byte, self.children[slot - 1]
+
+    def grow(self):
+        node = Node256(self.prefix)
+        node.terminal = self.terminal
+        for byte, child in self.items():
+            node.add_child(byte, child)
+        return node
+
+
+class Node256:
+    """Inner node with a direct slot for every possible byte"""
+    capacity = 256
+
+    def __init__(self, prefix=b""):
+        self.prefix = prefix
+        self.terminal = None
+        self.children = [None] * 256
+        self.count = 0
+
+    def find_child(self, byte):
+        return self.children[byte]
+
+    def add_child(self, byte, child):
+        if self.children[byte] is None:
+            self.count += 1
+        self.children[byte] = child
+
+    def is_full(self):
+        return False
+
+    def items(self):
+        for byte, child in enumerate(self.children):
+            if child is not None:
+                yield byte, child
+
+
+def _common_length(a, b):
+    length = min(len(a), len(b))
+    i = 0
+    while i < length and a[i] == b[i]:
+        i += 1
+    return i
+
+
+class AdaptiveRadixTree:
+    """
+    Adaptive radix tree over the UTF-8 bytes of string keys. Inner nodes
+    grow from 4 to 16, 48 and 256 children as needed, runs of single-child
+    nodes are collapsed into a node's prefix, and a leaf stays unexpanded
+    until a second key shares its path. A lookup therefore costs one step
+    per distinguishing byte of the key, independent of how many keys are
+    stored.
+    """
+
+    def __init__(self):
+        self.root = None
+        self.size = 0
+        # Optional OpCounter; when set, operations tally their steps into it
+        self.counter = None
+
+    def bulk_load(self, items):
+        """Replace the tree contents with (key, value) pairs"""
+        self.root = None
+        self.size = 0
+        for key, value in items:
+            self.insert(key, value)
+
+    def insert(self, key, value):
+        self.root = self._insert(self.root, ARTLeaf(str(key), value), 0)
+
+    def _attach(self, node, leaf, depth):
+        if depth == len(leaf.key_bytes):
+            node.terminal = leaf
+        else:
+            node.add_child(leaf.key_bytes[depth], leaf)
+
+    def _insert(self, node, leaf, depth):
+        counter = self.counter
+        if counter is not None:
+            counter.nodes_visited += 1
+
+        if node is None:
+            self.size += 1
+            return leaf
+
+        key_bytes = leaf.key_bytes
+        if isinstance(node, ARTLeaf):
+            if counter is not None:
+                counter.comparisons += 1
+            if node.key_bytes == key_bytes:
+                node.value = leaf.value
+                return node
+            # Lazy expansion: two keys now share this path, so split it at their first difference
+            common = _common_length(node.key_bytes[depth:], key_bytes[depth:])
+            if counter is not None:
+                counter.splits += 1
+            inner = Node4(key_bytes[depth:depth + common])
+            self._attach(inner, node, depth + common)
+            self._attach(inner, leaf, depth + common)
+            self.size += 1
+            return inner
+
+        prefix = node.prefix
+        common = _common_length(prefix, key_bytes[depth:depth + len(prefix)])
+        if counter is not None:
+            counter.comparisons += common + (1 if common < len(prefix) else 0)
+        if common < len(prefix):
+            # The key leaves the compressed path part-way: split the prefix
+            if counter is not None:
+                counter.splits += 1
+            inner = Node4(prefix[:common])
+            inner.add_child(prefix[common], node)
+            node.prefix = prefix[common + 1:]
+            self._attach(inner, leaf, depth + common)
+            self.size += 1
+            return inner
+
+        depth += len(prefix)
+        if depth == len(key_bytes):
+            if node.terminal is None:
+                self.size += 1
+                node.terminal = leaf
+            else:
+                node.terminal.value = leaf.value
+            return node
+
+        byte = key_bytes[depth]
+        child = node.find_child(byte)
+        if counter is not None:
+            counter.comparisons += 1
+        if child is not None:
+            if counter is not None:
+                counter.pointer_hops += 1
+            node.add_child(byte, self._insert(child, leaf, depth + 1))
+            return node
+
+        if node.is_full():
+            node = node.grow()
+        node.add_child(byte, leaf)
+        self.size += 1
+        return node
+
+    def search(self, key):
+        if self.counter is not None:
+            return self._counted_search(key)
+        key_bytes = str(key).encode("utf-8")
+        node = self.root
+        depth = 0
+        while node is not None:
+            if node.__class__ is ARTLeaf:
+                return node.value if node.key_bytes == key_bytes else None
+            prefix = node.prefix
+            if prefix:
+                end = depth + len(prefix)
+                if key_bytes[depth:end] != prefix:
+                    return None
+                depth = end
+            if depth == len(key_bytes):
+                return node.terminal.value if node.terminal is not None else None
+            node = node.find_child(key_bytes[depth])
+            depth += 1
+        return None
+
+    def _counted_search(self, key):
+        """search() that also tallies its steps into self.counter"""
+        key_bytes = str(key).encode("utf-8")
+        counter = self.counter
+        node = self.root
+        depth = 0
+        while node is not None:
+            if counter is not None:
+                counter.nodes_visited += 1
+            if isinstance(node, ARTLeaf):
+                if counter is not None:
+                    counter.comparisons += 1
+                return node.value if node.key_bytes == key_bytes else None
+
+            prefix = node.prefix
+            if counter is not None:
+                counter.comparisons += 1 + (1 if prefix else 0)
+            if key_bytes[depth:depth + len(prefix)] != prefix:
+                return None
+            depth += len(prefix)
+            if depth == len(key_bytes):
+                return node.terminal.value if node.terminal is not None else None
+
+            node = node.find_child(key_bytes[depth])
+            depth += 1
+            if counter is not None and node is not None:
+                counter.pointer_hops += 1
+        return None
+
+    def _iter_from(self, node, depth, bound):
+        """
+        Yield the leaves under node in key order, skipping keys below bound
+        (the start key's bytes, or None once every key left is past it).
+        The first depth bytes of every key here equal bound[:depth].
+        """
+        if isinstance(node, ARTLeaf):
+            if bound is None or node.key_bytes >= bound:
+                yield node
+            return
+
+        prefix = node.prefix
+        if bound is not None:
+            segment = bound[depth:depth + len(prefix)]
+            if prefix < segment:
+                return
+            if prefix > segment:
+                bound = None
+        depth += len(prefix)
+
+        if node.terminal is not None and (bound is None or len(bound) == depth):
+            yield node.terminal
+        if bound is not None and depth >= len(bound):
+            bound = None
+
+        for byte, child in node.items():
+            if bound is None:
+                yield from self._iter_from(child, depth + 1, None)
+            elif byte == bound[depth]:
+                yield from self._iter_from(child, depth + 1, bound)
+            elif byte > bound[depth]:
+                yield from self._iter_from(child, depth + 1, None)
+
+    def range_query(self, start_key=None, end_key=None):
+        """Yield (key, value) pairs with start_key <= key <= end_key in key order"""
+        if self.root is None:
+            return
+        bound = str(start_key).encode("utf-8") if start_key is not None else None
+        end_key = str(end_key) if end_key is not None else None
+        for leaf in self._iter_from(self.root, 0, bound):
+            if end_key is not None and leaf.key > end_key:
+                return
+            yield leaf.key, leaf.value
+
+    def prefix_scan(self, prefix):
+        """Yield (key, value) pairs whose key starts with prefix, in key order"""
+        prefix = str(prefix)
+        return itertools.takewhile(lambda item: item[0].startswith(prefix), self.range_query(prefix))
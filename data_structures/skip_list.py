@@ -7,54 +7,196 @@ class SkipNode:
         self.forward = [None] * (level + 1)
 
 class SkipList:
-    def __init__(self, max_level=16, p=0.5):
+    def __init__(self, max_level=16, p=0.5, seed=None):
         self.max_level = max_level
         self.p = p
+        # A seeded generator makes node levels, and so operation costs, reproducible
+        self.random = random.Random(seed) if seed is not None else random
         self.level = 0
+        self.size = 0
         self.header = SkipNode(-1, None, max_level)
-        
+        # Search path of the last insert, reused as a finger for the next one
+        # in either direction: _update[i] is the last node at level i whose
+        # key is <= _finger_key
+        self._update = [self.header] * (max_level + 1)
+        self._finger_key = None
+        # Optional OpCounter; when set, operations tally their steps into it
+        self.counter = None
+
     def random_level(self):
         lvl = 0
-        while random.random() < self.p and lvl < self.max_level:
+        while self.random.random() < self.p and lvl < self.max_level:
             lvl += 1
         return lvl
-        
+
+    def _grow_max_level(self):
+        """Raise max_level as the list grows so the expected top level stays log_{1/p}(n)"""
+        while self.size > (1 / self.p) ** self.max_level:
+            self.max_level += 1
+            self.header.forward.append(None)
+            self._update.append(self.header)
+
+    def bulk_load(self, items, levels=None):
+        """
+        Replace the list contents with (key, value) pairs sorted by key,
+        linking every node in one left-to-right pass. levels may supply the
+        node heights (e.g. drawn in a worker process); otherwise they are
+        drawn here.
+        """
+        self.size = len(items)
+        self._grow_max_level()
+        self.header.forward = [None] * (self.max_level + 1)
+        self._update = [self.header] * (self.max_level + 1)
+        self.level = 0
+
+        # _update[i] tracks the tail of level i while linking
+        tails = self._update
+        for index, (key, value) in enumerate(items):
+            node_level = min(levels[index], self.max_level) if levels is not None else self.random_level()
+            node = SkipNode(key, value, node_level)
+            for i in range(node_level + 1):
+                tails[i].forward[i] = node
+                tails[i] = node
+            if node_level > self.level:
+                self.level = node_level
+
+        # The tails are exactly the finger for appending after the last key
+        self._finger_key = items[-1][0] if items else None
+
+    def _find_update_path(self, key):
+        """Fill self._update with the predecessor of key at every level"""
+        update = self._update
+        # Forward moves, and forward keys that stopped a walk, for the counter
+        hops = stops = 0
+
+        if self._finger_key is not None and self._finger_key < key:
+            # Finger search: climb from the previous insert position only as
+            # high as needed to pass key, so nearby keys cost O(log distance)
+            # and appending past the tail is O(1)
+            top = 0
+            while top < self.level:
+                nxt = update[top].forward[top]
+                if nxt is not None:
+                    stops += 1
+                if nxt is None or not nxt.key < key:
+                    break
+                top += 1
+
+            current = update[top]
+            for i in range(top, -1, -1):
+                finger = update[i]
+                if finger is not self.header and (current is self.header or current.key < finger.key):
+                    current = finger
+                    stops += 1
+                while current.forward[i] and current.forward[i].key < key:
+                    current = current.forward[i]
+                    hops += 1
+                if current.forward[i]:
+                    stops += 1
+                update[i] = current
+        elif self._finger_key is not None:
+            # Backward finger: levels whose finger node is still before key
+            # keep it, since everything after it there is past the old key.
+            # Climb until one is, then walk down from it
+            top = 0
+            while top <= self.level and update[top] is not self.header and not update[top].key < key:
+                stops += 1
+                top += 1
+
+            if top > self.level:
+                # key precedes every finger node: search from the header
+                top = self.level
+                current = self.header
+            else:
+                current = update[top]
+            for i in range(top, -1, -1):
+                while current.forward[i] and current.forward[i].key < key:
+                    current = current.forward[i]
+                    hops += 1
+                if current.forward[i]:
+                    stops += 1
+                update[i] = current
+        else:
+            current = self.header
+            for i in range(self.level, -1, -1):
+                while current.forward[i] and current.forward[i].key < key:
+                    current = current.forward[i]
+                    hops += 1
+                if current.forward[i]:
+                    stops += 1
+                update[i] = current
+
+        if self.counter is not None:
+            self.counter.comparisons += hops + stops
+            self.counter.pointer_hops += hops
+            self.counter.nodes_visited += hops + 1
+        return update
+
     def insert(self, key, value):
-        update = [None] * (self.max_level + 1)
-        current = self.header
-        
-        for i in range(self.level, -1, -1):
-            while current.forward[i] and current.forward[i].key < key:
-                current = current.forward[i]
-            update[i] = current
-            
-        current = current.forward[0]
-        
+        update = self._find_update_path(key)
+        current = update[0].forward[0]
+
+        if self.counter is not None and current:
+            self.counter.comparisons += 1
         if current and current.key == key:
             current.value = value
+            for i in range(len(current.forward)):
+                update[i] = current
         else:
             new_level = self.random_level()
-            
+
             if new_level > self.level:
                 for i in range(self.level + 1, new_level + 1):
                     update[i] = self.header
                 self.level = new_level
-                
+
             new_node = SkipNode(key, value, new_level)
-            
+
             for i in range(new_level + 1):
                 new_node.forward[i] = update[i].forward[i]
                 update[i].forward[i] = new_node
-                
+                update[i] = new_node
+
+            self.size += 1
+            self._grow_max_level()
+
+        self._finger_key = key
+
     def search(self, key):
         current = self.header
+        hops = stops = 0
         
         for i in range(self.level, -1, -1):
             while current.forward[i] and current.forward[i].key < key:
                 current = current.forward[i]
+                hops += 1
+            if current.forward[i]:
+                stops += 1
                 
         current = current.forward[0]
+
+        if self.counter is not None:
+            # The final equality check counts as one more comparison
+            self.counter.comparisons += hops + stops + (1 if current else 0)
+            self.counter.pointer_hops += hops
+            self.counter.nodes_visited += hops + 1
         
         if current and current.key == key:
             return current.value
         return None
+
+    def range_query(self, start_key=None, end_key=None):
+        """Yield (key, value) pairs with start_key <= key <= end_key in key order"""
+        current = self.header
+
+        if start_key is not None:
+            for i in range(self.level, -1, -1):
+                while current.forward[i] and current.forward[i].key < start_key:
+                    current = current.forward[i]
+
+        current = current.forward[0]
+        while current:
+            if end_key is not None and current.key > end_key:
+                return
+            yield current.key, current.value
+            current = current.forward[0]
@@ -0,0 +1,132 @@
+import json
+import math
+
+import numpy as np
+
+# Field name used for values that are plain numbers rather than JSON objects
+VALUE_FIELD = "value"
+
+AGGREGATE_OPS = ("count", "sum", "min", "max", "mean", "histogram")
+
+
+def numeric_fields(value):
+    """
+    Extract the numeric fields of a stored value: a plain number becomes
+    {"value": x}, a JSON object (e.g. a CSV row) contributes its numeric
+    members. Anything else has no numeric fields.
+    """
+    try:
+        number = float(value)
+        return {VALUE_FIELD: number} if math.isfinite(number) else {}
+    except (TypeError, ValueError):
+        pass
+
+    if not isinstance(value, str) or not value.startswith("{"):
+        return {}
+    try:
+        row = json.loads(value)
+    except json.JSONDecodeError:
+        return {}
+    if not isinstance(row, dict):
+        return {}
+    return {
+        field: float(member) for field, member in row.items()
+        if isinstance(member, (int, float)) and not isinstance(member, bool)
+    }
+
+
+class NumericColumns:
+    """
+    Columnar side-array of the numeric fields of every value, aligned with
+    key order: `keys` is a sorted NumPy array of key strings (object dtype,
+    so keys of any length fit) and each column is a float64 array of the
+    same length, NaN where a key lacks that field.
+
+    Writes are staged and merged in one vectorized pass on the next query,
+    so a burst of writes costs one O(n) merge rather than one per write.
+    """
+
+    def __init__(self):
+        self.keys = np.array([], dtype=object)
+        self.columns = {}
+        self._pending = {}
+
+    @classmethod
+    def from_items(cls, items):
+        """Build the columns from (key, value) pairs sorted by key"""
+        columns = cls()
+        rows = []
+        for key, value in items:
+            fields = numeric_fields(value)
+            if fields:
+                rows.append((key, fields))
+        columns.keys = np.array([key for key, _ in rows], dtype=object)
+        field_names = {field for _, fields in rows for field in fields}
+        for field in field_names:
+            columns.columns[field] = np.array([fields.get(field, np.nan) for _, fields in rows], dtype=np.float64)
+        return columns
+
+    def stage(self, key, value):
+        """Record a write (value None for a delete) to merge before the next query"""
+        self._pending[key] = numeric_fields(value) if value is not None else None
+
+    def _merge_pending(self):
+        if not self._pending:
+            return
+        changed = sorted(self._pending)
+
+        # Drop the current rows of every changed key
+        keep = ~np.isin(self.keys, np.array(changed, dtype=object))
+        keys = self.keys[keep]
+        columns = {field: column[keep] for field, column in self.columns.items()}
+
+        # Insert the new rows at their sorted positions
+        rows = [(key, self._pending[key]) for key in changed if self._pending[key]]
+        self._pending = {}
+        if rows:
+            new_keys = np.array([key for key, _ in rows], dtype=object)
+            positions = np.searchsorted(keys, new_keys)
+            for field in {field for _, fields in rows for field in fields}:
+                columns.setdefault(field, np.full(len(keys), np.nan))
+            for field, column in columns.items():
+                new_values = np.array([fields.get(field, np.nan) for _, fields in rows], dtype=np.float64)
+                columns[field] = np.insert(column, positions, new_values)
+            keys = np.insert(keys, positions, new_keys)
+
+        self.keys = keys
+        self.columns = columns
+
+    def aggregate(self, field=VALUE_FIELD, op="sum", key_range=None, bins=10):
+        """
+        Evaluate op over the field's values for keys in key_range
+        ((start, end), inclusive, either end may be None). Histograms return
+        {"counts": [...], "edges": [...]}.
+        """
+        if op not in AGGREGATE_OPS:
+            raise ValueError(f"Unsupported aggregate: {op}")
+        self._merge_pending()
+
+        column = self.columns.get(field)
+        if column is None:
+            values = np.array([], dtype=np.float64)
+        else:
+            start, end = key_range if key_range else (None, None)
+            lo = np.searchsorted(self.keys, str(start), side="left") if start is not None else 0
+            hi = np.searchsorted(self.keys, str(end), side="right") if end is not None else len(self.keys)
+            values = column[lo:hi]
+            values = values[~np.isnan(values)]
+
+        if op == "count":
+            return int(values.size)
+        if op == "sum":
+            return float(values.sum())
+        if op == "histogram":
+            counts, edges = np.histogram(values, bins=bins)
+            return {"counts": counts.tolist(), "edges": edges.tolist()}
+        if values.size == 0:
+            return None
+        if op == "min":
+            return float(values.min())
+        if op == "max":
+            return float(values.max())
+        return float(values.mean())
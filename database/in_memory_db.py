@@ -1,40 +1,306 @@
+import itertools
+import os
 import time
+from contextlib import contextmanager
 from data_structures.btree import BPlusTree
 from data_structures.avl_tree import AVLTree
 from data_structures.skip_list import SkipList
+from data_structures.lsm_tree import LSMTree
+from data_structures.radix_tree import AdaptiveRadixTree
+from data_structures.frozen_index import FrozenIndex
+from data_structures.op_counter import OpCounter
+from data_structures.bloom_filter import CountingBloomFilter
 from database.wal import WAL
-from visualizer.data_structure_viz import DataStructureVisualizer
+from database.transaction import Transaction
+from database.parallel_build import prepare_sorted_items
+from database.snapshot import Snapshot, iter_export_items, page_items
 import copy
 
+# Index structures the database can switch between, with their display names
+STRUCTURE_NAMES = {
+    "btree": "B+ Tree",
+    "avl": "AVL Tree",
+    "skip_list": "Skip List",
+    "lsm": "LSM Tree",
+    "art": "Adaptive Radix Tree",
+    "frozen": "Frozen Sorted Array"
+}
+
+# Structures that delete with a tombstone instead of a rebuild
+TOMBSTONE_STRUCTURES = ("lsm", "frozen")
+
+# Phases of an operation's latency, in the order they happen
+PHASES = ["encode", "filter", "index", "rebuild", "wal_encode", "wal_write", "fsync", "overhead"]
+
 class InMemoryDB:
-    def __init__(self):
+    def __init__(self, wal_filename="wal.log", skip_list_p=0.5, build_workers=None, bloom_fp_rate=None):
+        self.skip_list_p = skip_list_p
+        # Worker processes used for whole-index rebuilds of large datasets and
+        # to decode WAL segments on recovery (None: serial)
+        self.build_workers = build_workers
         self.btree = BPlusTree(order=4)
         self.avl_tree = AVLTree()
-        self.skip_list = SkipList()
-        self.wal = WAL()
+        self.skip_list = SkipList(p=self.skip_list_p)
+        self.lsm_tree = LSMTree()
+        self.radix_tree = AdaptiveRadixTree()
+        self.frozen_index = FrozenIndex()
+        self.wal = WAL(wal_filename)
         self.current_structure = "btree"
         self.performance_metrics = {
-            "btree": {"insert": [], "search": [], "update": [], "delete": []},
-            "avl": {"insert": [], "search": [], "update": [], "delete": []},
-            "skip_list": {"insert": [], "search": [], "update": [], "delete": []}
+            structure: {"insert": [], "search": [], "update": [], "delete": []} for structure in STRUCTURE_NAMES
         }
         self.used_structures = set(["btree"])  # Start with btree as it's the default
+        # Per-operation nanosecond timings of each phase, see PHASES
+        self.phase_metrics = {}
+        # Phase samples of the writes inside group_commit(), which get the batch's write and fsync time
+        self._batch_samples = None
         self.data = {}
-        self.visualizer = DataStructureVisualizer()
+        # Bumped on every write so cached visualizations know when they are stale
+        self.version = 0
+        self._visualizer = None
+        # Numeric column store for aggregate(), built on first use
+        self._columns = None
+        # Optional Bloom filter that answers lookups for absent keys without touching the index
+        self.bloom_fp_rate = bloom_fp_rate
+        self.bloom = None
+        self.bloom_stats = {"lookups": 0, "avoided": 0, "false_positives": 0}
         self._recover_from_wal()
 
     def _recover_from_wal(self):
-        """Recover data from WAL file on startup"""
-        operations = self.wal.recover()
-        for operation in operations:
+        """Recover data from the checkpoint snapshot and WAL file on startup"""
+        checkpoint = self.wal.read_checkpoint()
+        checkpoint_seq = 0
+        if checkpoint:
+            self.data = dict(checkpoint["data"])
+            checkpoint_seq = checkpoint["seq"]
+
+        # Stream the segments in order; records already covered by the checkpoint are skipped
+        operations = self.wal.iter_records(after_seq=checkpoint_seq, workers=self.build_workers)
+        for operation in WAL.expand(operations):
             if operation["operation"] == "insert" or operation["operation"] == "update":
-                self.data[operation["key"]] = operation["value"]
-            elif operation["operation"] == "delete" and operation["key"] in self.data:
-                del self.data[operation["key"]]
+                self.data[str(operation["key"])] = self._encode_value(operation["value"])
+            elif operation["operation"] == "delete" and str(operation["key"]) in self.data:
+                del self.data[str(operation["key"])]
+        self._sync_data()
+
+    @staticmethod
+    def _encode_value(value):
+        return str(value) if not isinstance(value, str) else value
+
+    def apply_wal_records(self, records):
+        """
+        Apply logged operations (e.g. shipped from a primary) without writing
+        them to this database's own WAL.
+        """
+        structure = self._get_current_structure()
+        columns = self._columns
+        rebuild = False
+        for record in WAL.expand(records):
+            operation = record["operation"]
+            if operation == "insert" or operation == "update":
+                str_key = str(record["key"])
+                str_value = self._encode_value(record["value"])
+                if self.bloom is not None and str_key not in self.data:
+                    self._bloom_add(str_key)
+                self.data[str_key] = str_value
+                if not rebuild:
+                    structure.insert(str_key, str_value)
+                if columns is not None:
+                    columns.stage(str_key, str_value)
+            elif operation == "delete":
+                str_key = str(record["key"])
+                if self.data.pop(str_key, None) is not None:
+                    if self.current_structure not in TOMBSTONE_STRUCTURES:
+                        rebuild = True
+                    elif not rebuild:
+                        structure.delete(str_key)
+                    if self.bloom is not None:
+                        self.bloom.remove(str_key)
+                    if columns is not None:
+                        columns.stage(str_key, None)
+            elif operation == "clear":
+                self.data.clear()
+                rebuild = True
+                columns = self._columns = None
+        self.version += 1
+
+        # Deletes (other than tombstones) are applied by rebuilding once for the whole batch
+        if rebuild:
+            self._sync_data(parallel=False)
+
+    @contextmanager
+    def transaction(self):
+        """
+        Group writes into one atomic unit:
+
+            with db.transaction() as tx:
+                tx.insert("a", "1")
+                tx.delete("b")
+
+        Writes are buffered until the block exits, then logged as a single WAL
+        record with one fsync and applied together. An exception inside the
+        block discards the buffered writes.
+        """
+        tx = Transaction(self)
+        try:
+            yield tx
+        except Exception:
+            tx.rollback()
+            raise
+        tx.commit()
+
+    def _commit_transaction(self, operations):
+        """Log and apply the buffered (operation, key, value) writes of a transaction"""
+        if not operations:
+            return
+        start_time = time.time()
+        # Write-ahead: the transaction is durable before any of it becomes visible
+        self.wal.log_transaction(operations)
+        self.apply_wal_records(
+            {"operation": operation, "key": key, "value": value}
+            for operation, key, value in operations
+        )
+        self.used_structures.add(self.current_structure)
+        execution_time = (time.time() - start_time) * 1000
+        print(f"TRANSACTION: Structure: {self.current_structure}, Operations: {len(operations)}, Time: {execution_time:.3f}ms")
+
+    def bulk_insert(self, items, update_index=True):
+        """
+        Insert many (key, value) pairs, logged as a single WAL record with one
+        fsync. Items already sorted by key make the index inserts cheapest.
+        With update_index=False only the data is stored; the caller must
+        rebuild the index with _sync_data() afterwards.
+        """
+        operations = [("insert", str(key), self._encode_value(value)) for key, value in items]
+        if not operations:
+            return 0
+        self.wal.log_transaction(operations)
+
+        structure = self._get_current_structure()
+        for _, str_key, str_value in operations:
+            if self.bloom is not None and str_key not in self.data:
+                self._bloom_add(str_key)
+            self.data[str_key] = str_value
+            if update_index:
+                structure.insert(str_key, str_value)
+        if self._columns is not None:
+            for _, str_key, str_value in operations:
+                self._columns.stage(str_key, str_value)
+        self.version += 1
+        self.used_structures.add(self.current_structure)
+        return len(operations)
+
+    def import_csv(self, path_or_stream, key_column=None, chunksize=10000, progress_callback=None):
+        """
+        Stream a CSV file into the database chunk by chunk.
+
+        key_column is a column name or position (default: the first column);
+        the remaining columns of each row are stored as a JSON object. Each
+        chunk is encoded in one vectorized pass, sorted by key and handed to
+        bulk_insert, so memory use is bounded by chunksize rather than file
+        size. Importing into an empty database skips the per-chunk index
+        inserts and bulk builds the index once at the end. progress_callback(rows_imported, fraction) is called after each
+        chunk; fraction is None when the input size is unknown.
+        """
+        import pandas as pd
+
+        owns_file = isinstance(path_or_stream, (str, os.PathLike))
+        stream = open(path_or_stream, "rb") if owns_file else path_or_stream
+        start, total_size = 0, None
+        try:
+            if stream.seekable():
+                start = stream.tell()
+                total_size = stream.seek(0, os.SEEK_END) - start
+                stream.seek(start)
+        except (AttributeError, OSError):
+            pass
+
+        rows_imported = 0
+        build_at_end = not self.data
+        try:
+            for chunk in pd.read_csv(stream, chunksize=chunksize):
+                if key_column is None:
+                    key_name = chunk.columns[0]
+                elif isinstance(key_column, int):
+                    key_name = chunk.columns[key_column]
+                else:
+                    key_name = key_column
+
+                keys = chunk[key_name].astype(str)
+                value_columns = chunk.drop(columns=[key_name])
+                if len(value_columns.columns):
+                    values = value_columns.to_json(orient="records", lines=True).splitlines()
+                else:
+                    # Only a key column: store an empty object, as for any row without values
+                    values = ["{}"] * len(chunk)
+
+                # Stable sort keeps the last occurrence of a repeated key winning
+                order = keys.to_numpy().argsort(kind="stable")
+                key_list = keys.tolist()
+                rows_imported += self.bulk_insert(
+                    ((key_list[i], values[i]) for i in order), update_index=not build_at_end
+                )
+
+                if progress_callback:
+                    fraction = None
+                    if total_size:
+                        fraction = min((stream.tell() - start) / total_size, 1.0)
+                    progress_callback(rows_imported, fraction)
+        finally:
+            if owns_file:
+                stream.close()
+            if build_at_end:
+                self._sync_data()
+
+        print(f"IMPORT: Structure: {self.current_structure}, Rows: {rows_imported}")
+        return rows_imported
+
+    def load_snapshot(self, data):
+        """Replace the contents of the database with a checkpoint snapshot"""
+        self.data = dict(data)
+        self._columns = None
         self._sync_data()
 
-    def set_structure(self, structure_name):
-        """Change the current data structure with visualization"""
+    def checkpoint(self, truncate=True):
+        """
+        Write a snapshot of the current data and truncate the WAL it covers.
+        The data is read from a point-in-time snapshot, so writes may go on
+        while the checkpoint is being written.
+        """
+        snapshot = self.snapshot()
+        return self.wal.write_checkpoint(snapshot.get_all_data(), truncate=truncate, sequence=snapshot.sequence)
+
+    def snapshot(self):
+        """
+        Return an immutable view of the current contents. With the B+ tree
+        and AVL tree this is O(1): the view shares nodes with the live index,
+        which copies a node before modifying it. The LSM tree shares its
+        immutable runs and copies only the memtable. The skip list and radix
+        tree are not persistent, so their snapshot is a copy built from the data.
+        """
+        if self.current_structure in ("skip_list", "art"):
+            structure = AVLTree()
+            structure.bulk_load(sorted(self.data.items()))
+        else:
+            structure = self._get_current_structure().snapshot()
+        return Snapshot(structure, self.version, self.wal.sequence, len(self.data))
+
+    @property
+    def visualizer(self):
+        """
+        The graph renderer, created on first use. Importing it pulls in
+        graphviz, so headless users of the engine never pay for it.
+        """
+        if self._visualizer is None:
+            from visualizer.data_structure_viz import DataStructureVisualizer
+            self._visualizer = DataStructureVisualizer()
+        return self._visualizer
+
+    def set_structure(self, structure_name, visualize=True):
+        """
+        Change the current data structure, returning (before, after) graphs
+        of the transition, or (None, None) when visualize is False.
+        """
         if structure_name == self.current_structure:
             return None, None
 
@@ -43,6 +309,7 @@ class InMemoryDB:
 
         # Store old structure type
         old_structure = self.current_structure
+        old_version = self.version
 
         # Update current structure
         self.current_structure = structure_name
@@ -56,10 +323,14 @@ class InMemoryDB:
         # Get new structure object
         target_structure = self._get_current_structure()
 
+        if not visualize:
+            return None, None
+
         # Create transition visualization
         return self.visualizer.create_transition_animation(
             source_structure, target_structure,
-            old_structure, structure_name
+            old_structure, structure_name,
+            old_version, self.version
         )
 
     def _get_current_structure(self):
@@ -68,6 +339,12 @@ class InMemoryDB:
             return self.btree
         elif self.current_structure == "avl":
             return self.avl_tree
+        elif self.current_structure == "lsm":
+            return self.lsm_tree
+        elif self.current_structure == "art":
+            return self.radix_tree
+        elif self.current_structure == "frozen":
+            return self.frozen_index
         return self.skip_list
 
     def get_current_visualization(self):
@@ -75,42 +352,81 @@ class InMemoryDB:
         return self.visualizer.visualize_structure(
             self.current_structure,
             self._get_current_structure(),
-            "Current Structure"
+            "Current Structure",
+            self.version
         )
 
-    def _sync_data(self):
-        """Ensure all data is present in all structures"""
+    def _sync_data(self, parallel=True):
+        """
+        Rebuild the current structure from the data. Only whole-index
+        rebuilds are parallel; the rebuilds after deletes pass parallel=False
+        so a single write never starts a process pool.
+        """
+        self.version += 1
         if self.current_structure == "btree":
             self.btree = BPlusTree(order=4)
         elif self.current_structure == "avl":
             self.avl_tree = AVLTree()
+        elif self.current_structure == "lsm":
+            self.lsm_tree = LSMTree()
+        elif self.current_structure == "art":
+            self.radix_tree = AdaptiveRadixTree()
+        elif self.current_structure == "frozen":
+            self.frozen_index = FrozenIndex()
         else:
-            self.skip_list = SkipList()
+            self.skip_list = SkipList(p=self.skip_list_p)
 
-        for key, value in self.data.items():
-            if self.current_structure == "btree":
-                self.btree.insert(key, value)
-            elif self.current_structure == "avl":
-                self.avl_tree.insert(key, value)
-            else:
-                self.skip_list.insert(key, value)
+        # Sort once (in worker processes for large datasets) and bulk load in linear time
+        skip_list_p = self.skip_list_p if self.current_structure == "skip_list" else None
+        workers = self.build_workers if parallel else 1
+        items, levels = prepare_sorted_items(self.data, workers=workers, skip_list_p=skip_list_p)
+
+        if self.current_structure == "btree":
+            self.btree.bulk_load(items)
+        elif self.current_structure == "avl":
+            self.avl_tree.bulk_load(items)
+        elif self.current_structure == "lsm":
+            self.lsm_tree.bulk_load(items)
+        elif self.current_structure == "art":
+            self.radix_tree.bulk_load(items)
+        elif self.current_structure == "frozen":
+            self.frozen_index.bulk_load(items)
+        else:
+            self.skip_list.bulk_load(items, levels)
+
+        if self.bloom_fp_rate is not None:
+            self._rebuild_bloom()
 
     def insert(self, key, value):
         try:
+            phase_start = time.perf_counter_ns()
             start_time = time.time()
             # Convert key to string if it isn't already
             # Always convert key to string
             str_key = str(key)
             # Convert value to string if it's not already
             str_value = str(value) if not isinstance(value, str) else value
+            encoded = time.perf_counter_ns()
+            if self.bloom is not None and str_key not in self.data:
+                self._bloom_add(str_key)
             self.data[str_key] = str_value
+            if self._columns is not None:
+                self._columns.stage(str_key, str_value)
 
             if self.current_structure == "btree":
                 self.btree.insert(str_key, str_value)
             elif self.current_structure == "avl":
                 self.avl_tree.insert(str_key, str_value)
+            elif self.current_structure == "lsm":
+                self.lsm_tree.insert(str_key, str_value)
+            elif self.current_structure == "art":
+                self.radix_tree.insert(str_key, str_value)
+            elif self.current_structure == "frozen":
+                self.frozen_index.insert(str_key, str_value)
             else:
                 self.skip_list.insert(str_key, str_value)
+            self.version += 1
+            indexed = time.perf_counter_ns()
 
             end_time = time.time()
             # Add to used structures set to track which structures have been used
@@ -120,12 +436,14 @@ class InMemoryDB:
             self.performance_metrics[self.current_structure]["insert"].append(execution_time)
             print(f"INSERT: Structure: {self.current_structure}, Time: {execution_time:.3f}ms, Used structures: {self.used_structures}")
             self.wal.log_operation("insert", key, value)
+            self._record_phases("insert", phase_start, {"encode": encoded - phase_start, "index": indexed - encoded})
         except Exception as e:
             print(f"Error in insert operation for key {key}: {e}")
             raise
 
     def update(self, key, value):
         """Update an existing key with a new value"""
+        phase_start = time.perf_counter_ns()
         str_key = str(key)
         if str_key not in self.data:
             return False
@@ -134,14 +452,25 @@ class InMemoryDB:
             start_time = time.time()
             # Convert value to string if it's not already
             str_value = str(value) if not isinstance(value, str) else value
-            self.data[str_key] = str_value
-
+            encoded = time.perf_counter_ns()
+            # Index first: if it fails, the data is left as it was
             if self.current_structure == "btree":
-                self.btree.insert(key, value)  # B+ Tree insert handles updates
+                self.btree.insert(str_key, str_value)  # B+ Tree insert handles updates
             elif self.current_structure == "avl":
-                self.avl_tree.insert(key, value)  # AVL insert handles updates
+                self.avl_tree.insert(str_key, str_value)  # AVL insert handles updates
+            elif self.current_structure == "lsm":
+                self.lsm_tree.insert(str_key, str_value)  # Newer runs shadow older values
+            elif self.current_structure == "art":
+                self.radix_tree.insert(str_key, str_value)  # Radix tree insert replaces the leaf value
+            elif self.current_structure == "frozen":
+                self.frozen_index.insert(str_key, str_value)  # The delta shadows the frozen arrays
             else:
-                self.skip_list.insert(key, value)  # Skip List insert handles updates
+                self.skip_list.insert(str_key, str_value)  # Skip List insert handles updates
+            self.data[str_key] = str_value
+            if self._columns is not None:
+                self._columns.stage(str_key, str_value)
+            self.version += 1
+            indexed = time.perf_counter_ns()
 
             end_time = time.time()
             # Add to used structures set
@@ -151,6 +480,7 @@ class InMemoryDB:
             self.performance_metrics[self.current_structure]["update"].append(execution_time)
             print(f"UPDATE: Structure: {self.current_structure}, Time: {execution_time:.3f}ms, Used structures: {self.used_structures}")
             self.wal.log_operation("update", key, value)
+            self._record_phases("update", phase_start, {"encode": encoded - phase_start, "index": indexed - encoded})
             return True
         except Exception as e:
             print(f"Error in update operation for key {key}: {e}")
@@ -158,8 +488,10 @@ class InMemoryDB:
 
     def delete(self, key):
         """Delete a key-value pair from the database"""
+        phase_start = time.perf_counter_ns()
         # Always convert key to string for consistent handling
         str_key = str(key)
+        encoded = time.perf_counter_ns()
         print(f"Attempting to delete key: {str_key}")
         print(f"Available keys: {list(self.data.keys())}")
         
@@ -169,8 +501,19 @@ class InMemoryDB:
 
         try:
             start_time = time.time()
+            rebuild_start = time.perf_counter_ns()
             del self.data[str_key]
-            self._sync_data()  # Rebuild current structure without the deleted key
+            if self.bloom is not None:
+                self.bloom.remove(str_key)
+            if self._columns is not None:
+                self._columns.stage(str_key, None)
+            if self.current_structure in TOMBSTONE_STRUCTURES:
+                # Write a tombstone instead of rebuilding
+                self._get_current_structure().delete(str_key)
+                self.version += 1
+            else:
+                self._sync_data(parallel=False)  # Rebuild current structure without the deleted key
+            rebuilt = time.perf_counter_ns()
 
             end_time = time.time()
             # Add to used structures set
@@ -180,6 +523,8 @@ class InMemoryDB:
             self.performance_metrics[self.current_structure]["delete"].append(execution_time)
             print(f"DELETE: Structure: {self.current_structure}, Time: {execution_time:.3f}ms, Used structures: {self.used_structures}")
             self.wal.log_operation("delete", key, None)
+            phase = "index" if self.current_structure in TOMBSTONE_STRUCTURES else "rebuild"
+            self._record_phases("delete", phase_start, {"encode": encoded - phase_start, phase: rebuilt - rebuild_start})
             return True
         except Exception as e:
             print(f"Error in delete operation for key {key}: {e}")
@@ -188,16 +533,31 @@ class InMemoryDB:
     def search(self, key):
         result = None
         try:
+            phase_start = time.perf_counter_ns()
             start_time = time.time()
             # Always convert key to string for consistent searching
             str_key = str(key)
+            encoded = time.perf_counter_ns()
+            rejected = self._bloom_rejects(str_key)
+            filtered = time.perf_counter_ns()
 
-            if self.current_structure == "btree":
+            if rejected:
+                result = None
+            elif self.current_structure == "btree":
                 result = self.btree.search(str_key)
             elif self.current_structure == "avl":
                 result = self.avl_tree.search(str_key)
+            elif self.current_structure == "lsm":
+                result = self.lsm_tree.search(str_key)
+            elif self.current_structure == "art":
+                result = self.radix_tree.search(str_key)
+            elif self.current_structure == "frozen":
+                result = self.frozen_index.search(str_key)
             else:
                 result = self.skip_list.search(str_key)
+            indexed = time.perf_counter_ns()
+            if self.bloom is not None and not rejected and result is None:
+                self.bloom_stats["false_positives"] += 1
 
             end_time = time.time()
             # Add to used structures set
@@ -206,11 +566,256 @@ class InMemoryDB:
             execution_time = (end_time - start_time) * 1000
             self.performance_metrics[self.current_structure]["search"].append(execution_time)
             print(f"SEARCH: Structure: {self.current_structure}, Time: {execution_time:.3f}ms, Used structures: {self.used_structures}")
+            self._record_phases("search", phase_start,
+                                {"encode": encoded - phase_start, "filter": filtered - encoded, "index": indexed - filtered},
+                                include_wal=False)
         except Exception as e:
             print(f"Error in search operation for key {key}: {e}")
 
         return result
 
+    def get_many(self, keys):
+        """Look up several keys at once, returning (key, value) pairs for the keys found, in key order"""
+        structure = self._get_current_structure()
+        results = []
+        for key in sorted(set(str(k) for k in keys)):
+            if self._bloom_rejects(key):
+                continue
+            value = structure.search(key)
+            if value is not None:
+                results.append((key, value))
+            elif self.bloom is not None:
+                self.bloom_stats["false_positives"] += 1
+        return results
+
+    def range_query(self, start_key=None, end_key=None):
+        """Return (key, value) pairs with start_key <= key <= end_key from the ordered index"""
+        start_key = str(start_key) if start_key is not None else None
+        end_key = str(end_key) if end_key is not None else None
+        return list(self._get_current_structure().range_query(start_key, end_key))
+
+    def freeze(self):
+        """
+        Switch to the read-optimized frozen index: the data is compacted into
+        contiguous sorted key and value arrays. Later writes go to a small
+        delta; calling freeze() again merges it into the arrays.
+        """
+        if self.current_structure != "frozen":
+            self.set_structure("frozen", visualize=False)
+        elif self.frozen_index.delta:
+            self.frozen_index = self.frozen_index.merged()
+            self.version += 1
+        print(f"FREEZE: {len(self.frozen_index.keys)} keys frozen")
+
+    def prefix_scan(self, prefix):
+        """Return (key, value) pairs whose key starts with prefix, in key order"""
+        prefix = str(prefix)
+        if self.current_structure == "art":
+            return list(self.radix_tree.prefix_scan(prefix))
+        items = self._get_current_structure().range_query(prefix, None)
+        return list(itertools.takewhile(lambda item: item[0].startswith(prefix), items))
+
+    def page(self, after_key=None, size=50):
+        """
+        Return one page of (key, value) pairs in key order, starting after
+        after_key, plus the cursor for the next page (None on the last page).
+        The page is read straight from the ordered index, so its cost depends
+        on the page size rather than the number of keys.
+        """
+        return page_items(self._get_current_structure(), after_key, size)
+
+    def iter_export(self, fmt="csv", chunksize=1000):
+        """
+        Yield the database contents in key order as CSV or JSON Lines text
+        chunks, read from a snapshot taken when the export starts so that
+        writes made while it is streamed do not show up half-way through.
+        """
+        if fmt not in ("csv", "jsonl"):
+            raise ValueError(f"Unsupported export format: {fmt}")
+        return iter_export_items(self.snapshot().range_query(), fmt, chunksize)
+
+    def export(self, stream, fmt="csv", chunksize=1000):
+        """Write the database contents to a text stream one chunk at a time"""
+        for chunk in self.iter_export(fmt, chunksize):
+            stream.write(chunk)
+
+    def enable_bloom_filter(self, fp_rate=0.01):
+        """Put a counting Bloom filter with the given false-positive rate in front of lookups"""
+        self.bloom_fp_rate = fp_rate
+        self._rebuild_bloom()
+
+    def disable_bloom_filter(self):
+        self.bloom_fp_rate = None
+        self.bloom = None
+
+    def _rebuild_bloom(self):
+        """Rebuild the filter from the current keys, with room for the data to double"""
+        self.bloom = CountingBloomFilter(max(2 * len(self.data), 1024), self.bloom_fp_rate)
+        for key in self.data:
+            self.bloom.add(key)
+
+    def _bloom_add(self, str_key):
+        # Past capacity the false-positive rate degrades, so grow the filter
+        if self.bloom.count >= self.bloom.capacity:
+            self._rebuild_bloom()
+        self.bloom.add(str_key)
+
+    def _bloom_rejects(self, str_key):
+        """Return True when the Bloom filter proves str_key is absent"""
+        if self.bloom is None:
+            return False
+        self.bloom_stats["lookups"] += 1
+        if self.bloom.might_contain(str_key):
+            return False
+        self.bloom_stats["avoided"] += 1
+        return True
+
+    def get_bloom_stats(self):
+        """Lookups screened by the Bloom filter, how many index walks it avoided, and its false positives"""
+        stats = dict(self.bloom_stats)
+        negatives = stats["avoided"] + stats["false_positives"]
+        stats["enabled"] = self.bloom is not None
+        stats["observed_fp_rate"] = stats["false_positives"] / negatives if negatives else 0.0
+        if self.bloom is not None:
+            stats.update({
+                "target_fp_rate": self.bloom.fp_rate,
+                "keys": self.bloom.count,
+                "capacity": self.bloom.capacity,
+                "memory_bytes": len(self.bloom.counters)
+            })
+        return stats
+
+    def _new_structure(self, structure_name, seed=None):
+        """Create an empty index of the given type"""
+        if structure_name == "btree":
+            return BPlusTree(order=4)
+        elif structure_name == "avl":
+            return AVLTree()
+        elif structure_name == "lsm":
+            # Compact inline so step counts do not depend on thread timing
+            return LSMTree(background=False)
+        elif structure_name == "art":
+            return AdaptiveRadixTree()
+        elif structure_name == "frozen":
+            return FrozenIndex()
+        return SkipList(p=self.skip_list_p, seed=seed)
+
+    def explain(self, op, key, value=None, structures=None):
+        """
+        Count the primitive steps (key comparisons, nodes visited, rotations,
+        splits, pointer hops) that op ("search", "insert", "update" or
+        "delete") on key costs in each structure, without changing the data.
+
+        Searches on the current structure use the live index. Everything
+        else runs against a scratch index bulk loaded from the current data
+        (with a fixed skip list seed), so the counts are deterministic.
+        Deletes rebuild the index here, so they report the lookup plus
+        the number of keys rebuilt; the LSM tree and frozen index write a
+        tombstone instead.
+        """
+        if op not in ("search", "insert", "update", "delete"):
+            raise ValueError(f"Unsupported operation for explain: {op}")
+
+        str_key = str(key)
+        items = None
+        result = {}
+        for structure_name in structures or [self.current_structure]:
+            if op == "search" and structure_name == self.current_structure:
+                structure = self._get_current_structure()
+            else:
+                if items is None:
+                    items = sorted(self.data.items())
+                structure = self._new_structure(structure_name, seed=0)
+                structure.bulk_load(items)
+
+            counter = OpCounter()
+            structure.counter = counter
+            try:
+                if op in ("insert", "update"):
+                    structure.insert(str_key, self._encode_value(value))
+                elif op == "delete" and structure_name in TOMBSTONE_STRUCTURES:
+                    structure.delete(str_key)
+                else:
+                    structure.search(str_key)
+            finally:
+                structure.counter = None
+
+            result[structure_name] = counter.as_dict()
+            if op == "delete" and structure_name in TOMBSTONE_STRUCTURES:
+                result[structure_name]["rebuilt_keys"] = 0
+            elif op == "delete":
+                result[structure_name]["rebuilt_keys"] = max(len(self.data) - (1 if str_key in self.data else 0), 0)
+        return result
+
+    def aggregate(self, field=None, op="sum", key_range=None, bins=10):
+        """
+        Aggregate a numeric field over a key range with NumPy.
+
+        field names a numeric member of JSON object values (e.g. a CSV
+        column); None means values that are plain numbers. op is one of
+        count, sum, min, max, mean or histogram, and key_range is an
+        inclusive (start, end) pair where either end may be None. The column
+        store is built from the data on first use and kept up to date by
+        later writes.
+        """
+        from database.columns import NumericColumns, VALUE_FIELD
+
+        if self._columns is None:
+            self._columns = NumericColumns.from_items(sorted(self.data.items()))
+        return self._columns.aggregate(field or VALUE_FIELD, op, key_range, bins)
+
+    def _record_phases(self, operation, phase_start, phases, include_wal=True):
+        """
+        Store the per-phase nanosecond timings of one operation. WAL phases
+        come from the last WAL append; whatever is left of the total (metric
+        bookkeeping, logging) is recorded as overhead.
+        """
+        if include_wal:
+            phases.update(self.wal.last_timings)
+        total = time.perf_counter_ns() - phase_start
+        phases["overhead"] = max(total - sum(phases.values()), 0)
+        self.phase_metrics.setdefault(self.current_structure, {}).setdefault(operation, []).append(phases)
+        if include_wal and self._batch_samples is not None:
+            self._batch_samples.append(phases)
+
+    @contextmanager
+    def group_commit(self):
+        """
+        Write the WAL records of the writes made in the block with a single
+        write and fsync on exit (see WAL.batch). That write and fsync time
+        is then split evenly over the writes' phase samples, so the latency
+        breakdown still shows what durability costs per operation.
+        """
+        samples = self._batch_samples = []
+        try:
+            with self.wal.batch():
+                yield
+        finally:
+            self._batch_samples = None
+        if samples:
+            for phase in ("wal_write", "fsync"):
+                share = self.wal.last_timings[phase] // len(samples)
+                for phases in samples:
+                    phases[phase] = share
+
+    def get_phase_breakdown(self):
+        """
+        Average time per phase in milliseconds, by structure and operation:
+        {structure: {operation: {phase: avg_ms, ..., "count": n}}}
+        """
+        breakdown = {}
+        for structure, operations in self.phase_metrics.items():
+            for operation, samples in operations.items():
+                if not samples:
+                    continue
+                averages = {
+                    phase: sum(sample.get(phase, 0) for sample in samples) / len(samples) / 1e6
+                    for phase in PHASES
+                }
+                averages["count"] = len(samples)
+                breakdown.setdefault(structure, {})[operation] = averages
+        return breakdown
+
     def get_performance_metrics(self):
         """
         Get the current performance metrics for all structures.
@@ -235,11 +840,7 @@ class InMemoryDB:
         """Calculate and return performance summary for each structure"""
         print(f"Calculating performance summary. Used structures: {self.used_structures}")
         summary = {}
-        structure_names = {
-            "btree": "B+ Tree",
-            "avl": "AVL Tree",
-            "skip_list": "Skip List"
-        }
+        structure_names = STRUCTURE_NAMES
         
         # Recalculate metrics if there's no data
         if not any(structure in self.used_structures for structure in self.performance_metrics):
@@ -316,7 +917,7 @@ class InMemoryDB:
     def get_best_structure(self):
         """Determine the best performing structure based on metrics"""
         # Check if all data structures have been used
-        all_structures = {"btree", "avl", "skip_list"}
+        all_structures = set(STRUCTURE_NAMES)
         
         # Only return a result if all structures have been used
         if not all_structures.issubset(self.used_structures):
@@ -326,8 +927,8 @@ class InMemoryDB:
         # Get performance summary
         summary = self.get_performance_summary()
         
-        if len(summary) < 3:  # Must have data for all 3 structures
-            print(f"Not enough structures with performance data. Found: {len(summary)}, Expected: 3")
+        if len(summary) < len(all_structures):  # Must have data for every structure
+            print(f"Not enough structures with performance data. Found: {len(summary)}, Expected: {len(all_structures)}")
             return None
 
         # Find structures with performance data (at least one operation recorded)
@@ -337,8 +938,8 @@ class InMemoryDB:
             if stats["avg_insert"] > 0 or stats["avg_search"] > 0 or stats["avg_update"] > 0 or stats["avg_delete"] > 0:
                 structures_with_data.append((name, stats))
         
-        if len(structures_with_data) < 3:  # Need at least some data for all structures
-            print(f"Not all structures have performance data. Found: {len(structures_with_data)}, Expected: 3")
+        if len(structures_with_data) < len(all_structures):  # Need at least some data for all structures
+            print(f"Not all structures have performance data. Found: {len(structures_with_data)}, Expected: {len(all_structures)}")
             return None
         
         # Find the best structure (lowest overall average)
@@ -349,7 +950,7 @@ class InMemoryDB:
     def get_best_search_structure(self):
         """Determine the best performing structure specifically for search operations"""
         # Check if all data structures have been used for searching
-        all_structures = {"btree", "avl", "skip_list"}
+        all_structures = set(STRUCTURE_NAMES)
         
         # Track which structures have search operations
         structures_with_search = set()
@@ -370,7 +971,7 @@ class InMemoryDB:
             if search_times:
                 avg_search_time = sum(search_times) / len(search_times)
                 search_performance[structure] = {
-                    "name": {"btree": "B+ Tree", "avl": "AVL Tree", "skip_list": "Skip List"}[structure],
+                    "name": STRUCTURE_NAMES[structure],
                     "avg_search_time": avg_search_time
                 }
         
@@ -393,26 +994,28 @@ class InMemoryDB:
         """Clear all data from the database"""
         # Clear main data structure
         self.data.clear()
+        self._columns = None
+        if self.bloom_fp_rate is not None:
+            self._rebuild_bloom()
+        self.version += 1
         
         # Reset all data structures
         self.btree = BPlusTree(order=4)
         self.avl_tree = AVLTree()
-        self.skip_list = SkipList()
+        self.skip_list = SkipList(p=self.skip_list_p)
+        self.lsm_tree = LSMTree()
+        self.radix_tree = AdaptiveRadixTree()
+        self.frozen_index = FrozenIndex()
         
         # Reset performance metrics
         self.performance_metrics = {
-            "btree": {"insert": [], "search": [], "update": [], "delete": []},
-            "avl": {"insert": [], "search": [], "update": [], "delete": []},
-            "skip_list": {"insert": [], "search": [], "update": [], "delete": []}
+            structure: {"insert": [], "search": [], "update": [], "delete": []} for structure in STRUCTURE_NAMES
         }
         
-        # Reset WAL by recreating it and clearing the file
-        self.wal = WAL()
-        try:
-            with open(self.wal.filename, 'w') as f:
-                f.truncate(0)  # Clear the file contents
-        except Exception as e:
-            print(f"Error clearing WAL file: {e}")
+        self.phase_metrics = {}
+
+        # Reset WAL by clearing the file and any checkpoint
+        self.wal.reset()
             
         # Log the clear operation in the fresh WAL
         self.wal.log_operation("clear", None, None)
@@ -0,0 +1,79 @@
+import bisect
+import itertools
+import math
+import random
+
+# Below this many keys the cost of shipping data to worker processes
+# outweighs the parallel sort, so the build stays in-process
+PARALLEL_BUILD_THRESHOLD = 200000
+
+
+def _draw_levels(count, p, max_level, seed):
+    rng = random.Random(seed)
+    levels = []
+    for _ in range(count):
+        level = 0
+        while rng.random() < p and level < max_level:
+            level += 1
+        levels.append(level)
+    return levels
+
+
+def _prepare_partition(items, skip_list_p, max_level, seed):
+    """Worker: sort one key-range partition and, for skip lists, draw its node levels"""
+    items.sort()
+    levels = None
+    if skip_list_p is not None:
+        levels = _draw_levels(len(items), skip_list_p, max_level, seed)
+    return items, levels
+
+
+def _range_partitions(data, partitions):
+    """Split a dict's items into key-range partitions using sampled boundaries"""
+    keys = list(data)
+    sample = sorted(random.sample(keys, min(len(keys), 100 * partitions)))
+    step = len(sample) / partitions
+    boundaries = [sample[int(step * i)] for i in range(1, partitions)]
+
+    buckets = [[] for _ in range(partitions)]
+    for item in data.items():
+        buckets[bisect.bisect_right(boundaries, item[0])].append(item)
+    return buckets
+
+
+def prepare_sorted_items(data, workers=None, threshold=PARALLEL_BUILD_THRESHOLD, skip_list_p=None):
+    """
+    Return (items, levels): the dict's (key, value) pairs sorted by key, plus
+    pre-drawn skip list levels when skip_list_p is given (None otherwise).
+
+    With workers > 1, large inputs are partitioned by key range and each
+    partition is sorted (and its skip list segment's levels drawn) in a
+    worker process. Because partitions cover disjoint, ordered key ranges,
+    stitching them back together is a linear concatenation. The default is
+    a serial build: starting a process pool forks the caller, which is only
+    safe when it has no other threads running.
+    """
+    workers = workers or 1
+    max_level = max(16, math.ceil(math.log(max(len(data), 2), 1 / skip_list_p))) if skip_list_p else 0
+
+    if workers <= 1 or len(data) < threshold:
+        items, levels = _prepare_partition(list(data.items()), skip_list_p, max_level, None)
+        return items, levels
+
+    # Imported here: the process pool machinery is costly to import and only
+    # needed for large rebuilds
+    from concurrent.futures import ProcessPoolExecutor
+
+    partitions = _range_partitions(data, workers)
+    seeds = [random.getrandbits(32) for _ in partitions]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(
+            _prepare_partition, partitions,
+            itertools.repeat(skip_list_p), itertools.repeat(max_level), seeds
+        ))
+
+    items = list(itertools.chain.from_iterable(part for part, _ in results))
+    levels = None
+    if skip_list_p is not None:
+        levels = list(itertools.chain.from_iterable(part_levels for _, part_levels in results))
+    return items, levels
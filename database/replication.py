@@ -0,0 +1,227 @@
+import argparse
+import json
+import os
+import time
+from datetime import datetime
+
+from database.in_memory_db import InMemoryDB
+from database.wal import WAL, decode_segment
+
+
+class WALFollower:
+    """
+    Read replica that tails a primary's WAL, following it across segment
+    rotations.
+
+    Records are applied to the follower's own InMemoryDB in sequence-number
+    order. When the follower falls too far behind, or the records it needs
+    were truncated by a checkpoint on the primary, it reloads the primary's
+    checkpoint snapshot and continues from there.
+    """
+
+    def __init__(self, wal_filename="wal.log", replica_wal_filename=None,
+                 max_lag_ops=10000, batch_size=1000):
+        # Opened read-only: the follower must never create or repair the primary's files
+        self.primary_wal = WAL(wal_filename, read_only=True)
+
+        # The replica never writes to its own WAL; it is rebuilt from the primary
+        self.db = InMemoryDB(wal_filename=replica_wal_filename or wal_filename + ".replica")
+        self.max_lag_ops = max_lag_ops
+        self.batch_size = batch_size
+
+        self.applied_seq = 0
+        self.applied_timestamp = None
+        self.snapshots_loaded = 0
+        self._offset = 0
+        self._buffer = b""
+        # Identity of the active WAL file being tailed; the inode changes when
+        # the primary rotates, the generation when it truncates the file
+        self._inode = None
+        self._generation = None
+
+        self._load_checkpoint()
+
+    def _load_checkpoint(self):
+        """Catch up from the primary's checkpoint snapshot, if it is ahead of us"""
+        checkpoint = self.primary_wal.read_checkpoint()
+        if not checkpoint or checkpoint["seq"] <= self.applied_seq:
+            return False
+        self.db.load_snapshot(checkpoint["data"])
+        self.applied_seq = checkpoint["seq"]
+        self.applied_timestamp = checkpoint["timestamp"]
+        self.snapshots_loaded += 1
+        print(f"REPLICA: Loaded checkpoint at seq {self.applied_seq}")
+        return True
+
+    def _read_new_records(self):
+        """Read complete records appended to the primary WAL since the last poll"""
+        if not os.path.exists(self.primary_wal.filename):
+            return []
+
+        records = []
+        generation = self.primary_wal.generation()
+        with open(self.primary_wal.filename, "rb") as f:
+            stat = os.fstat(f.fileno())
+            replaced = stat.st_ino != self._inode or generation != self._generation or stat.st_size < self._offset
+            if not replaced and self._offset and not self._buffer:
+                # We stopped right after a newline; if that byte changed, the file was rewritten
+                f.seek(self._offset - 1)
+                replaced = f.read(1) != b"\n"
+            if replaced:
+                # A new active file: the old one was sealed into a segment (or
+                # truncated by a checkpoint or clear), so first pick up any
+                # sealed records we have not applied yet
+                for segment in self.primary_wal.segments():
+                    if segment["last_seq"] > self.applied_seq:
+                        path = os.path.join(os.path.dirname(self.primary_wal.filename), segment["file"])
+                        records.extend(decode_segment(path, self.applied_seq))
+                if not records:
+                    # Nothing sealed left to replay; a checkpoint may have covered it
+                    self._load_checkpoint()
+                self._inode = stat.st_ino
+                self._generation = generation
+                self._offset = 0
+                self._buffer = b""
+            f.seek(self._offset)
+            chunk = f.read()
+        self._offset += len(chunk)
+
+        # Keep a trailing partial line until the rest of it is written
+        data = self._buffer + chunk
+        lines = data.split(b"\n")
+        self._buffer = lines.pop()
+
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                print(f"Skipping corrupted WAL entry: {line}")
+        return records
+
+    def poll(self):
+        """Apply any new primary records and return how many records were read"""
+        records = self._read_new_records()
+
+        if records and self.primary_wal.read_last_sequence() - self.applied_seq > self.max_lag_ops:
+            self._load_checkpoint()
+
+        if not self._apply(records, allow_gap=False):
+            # Still a gap after loading the checkpoint: the file was truncated
+            # and rewritten past our offset between polls, so we read from the
+            # middle of it. Start over from the beginning of the active file.
+            self._inode = None
+            records = self._read_new_records()
+            self._apply(records, allow_gap=True)
+        return len(records)
+
+    def _apply(self, records, allow_gap):
+        """
+        Apply records in sequence order. On a gap that the primary's
+        checkpoint does not cover, stop and return False unless allow_gap.
+        """
+        pending = []
+        expected_seq = self.applied_seq + 1
+        for record in records:
+            seq = record.get("seq", expected_seq)
+            if seq < expected_seq:
+                continue
+            if seq > expected_seq and record["operation"] != "clear":
+                # Records in between were truncated away; the snapshot may cover them
+                self.db.apply_wal_records(pending)
+                pending = []
+                self._load_checkpoint()
+                if seq <= self.applied_seq:
+                    expected_seq = self.applied_seq + 1
+                    continue
+                if seq > self.applied_seq + 1 and not allow_gap:
+                    return False
+                if seq > self.applied_seq + 1:
+                    print(f"REPLICA: Records {self.applied_seq + 1}..{seq - 1} are missing on the primary")
+            pending.append(record)
+            self.applied_seq = seq
+            self.applied_timestamp = record["timestamp"]
+            expected_seq = seq + 1
+
+            if len(pending) >= self.batch_size:
+                self.db.apply_wal_records(pending)
+                pending = []
+
+        self.db.apply_wal_records(pending)
+        return True
+
+    def replication_lag(self):
+        """
+        Return how far the replica is behind the primary, in operations and
+        milliseconds. The time lag is the age of the oldest primary record
+        not applied yet, so it is 0 when caught up however long the primary
+        has been idle.
+        """
+        head_seq = max(self.primary_wal.read_last_sequence(), self.primary_wal.read_checkpoint_sequence())
+        lag_ops = max(head_seq - self.applied_seq, 0)
+        lag_ms = 0.0
+        if lag_ops:
+            timestamp = self._oldest_unapplied_timestamp()
+            if timestamp:
+                written_at = datetime.fromisoformat(timestamp)
+                lag_ms = max((datetime.now() - written_at).total_seconds() * 1000, 0.0)
+        return {"ops": lag_ops, "ms": lag_ms, "applied_seq": self.applied_seq, "primary_seq": head_seq}
+
+    def _oldest_unapplied_timestamp(self):
+        """Timestamp of the first primary record after applied_seq, or None"""
+        # Usually the next line after our read offset in the active file
+        try:
+            with open(self.primary_wal.filename, "rb") as f:
+                f.seek(self._offset)
+                line = self._buffer + f.readline()
+            if line.endswith(b"\n"):
+                record = json.loads(line)
+                if record.get("seq") == self.applied_seq + 1:
+                    return record["timestamp"]
+        except (OSError, ValueError, KeyError):
+            pass
+        # Otherwise it was sealed into a segment, rewritten, or only the checkpoint has it
+        for record in self.primary_wal.iter_records(self.applied_seq):
+            return record["timestamp"]
+        checkpoint = self.primary_wal.read_checkpoint()
+        if checkpoint and checkpoint["seq"] > self.applied_seq:
+            return checkpoint["timestamp"]
+        return None
+
+    def follow(self, poll_interval=0.05, stop_after=None):
+        """Keep polling the primary WAL until stop_after seconds have passed (or forever)"""
+        started = time.time()
+        while stop_after is None or time.time() - started < stop_after:
+            if not self.poll():
+                time.sleep(poll_interval)
+
+    def search(self, key):
+        return self.db.search(key)
+
+    def get_many(self, keys):
+        return self.db.get_many(keys)
+
+    def range_query(self, start_key=None, end_key=None):
+        return self.db.range_query(start_key, end_key)
+
+    def get_all_data(self):
+        return self.db.get_all_data()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a read replica that tails a primary WAL file")
+    parser.add_argument("--wal", default="wal.log", help="primary WAL file to follow")
+    parser.add_argument("--interval", type=float, default=1.0, help="seconds between lag reports")
+    args = parser.parse_args()
+
+    follower = WALFollower(wal_filename=args.wal)
+    while True:
+        follower.follow(stop_after=args.interval)
+        lag = follower.replication_lag()
+        print(f"REPLICA: applied seq {lag['applied_seq']}, lag {lag['ops']} ops / {lag['ms']:.1f}ms, "
+              f"{len(follower.db.data)} keys")
+
+
+if __name__ == "__main__":
+    main()
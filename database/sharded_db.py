@@ -0,0 +1,180 @@
+import bisect
+import heapq
+import multiprocessing
+import zlib
+
+
+def _shard_worker(conn, wal_filename, structure):
+    """Serve batched operations for one shard until the parent sends None"""
+    # Imported here so the parent process does not need to build an engine
+    from database.in_memory_db import InMemoryDB
+
+    # Shard processes are daemonic and may not start worker processes of their own
+    db = InMemoryDB(wal_filename=wal_filename, build_workers=1)
+    if structure != db.current_structure:
+        db.set_structure(structure, visualize=False)
+
+    while True:
+        batch = conn.recv()
+        if batch is None:
+            break
+        results = []
+        for method, args in batch:
+            try:
+                results.append((True, getattr(db, method)(*args)))
+            except Exception as e:
+                results.append((False, f"{type(e).__name__}: {e}"))
+        conn.send(results)
+    conn.close()
+
+
+class ShardedDB:
+    """
+    Front-end that splits the keyspace across worker processes.
+
+    Each shard runs its own InMemoryDB with its own WAL file. Operations are
+    routed by key, either by hash or by key range, and sent to the workers in
+    batches over pipes so one round trip can carry many operations.
+    """
+
+    def __init__(self, num_shards=None, partitioning="hash", boundaries=None,
+                 structure="btree", wal_prefix="wal_shard"):
+        if partitioning not in ("hash", "range"):
+            raise ValueError(f"Unknown partitioning scheme: {partitioning}")
+
+        self.num_shards = num_shards or multiprocessing.cpu_count()
+        self.partitioning = partitioning
+        self.boundaries = [str(b) for b in boundaries] if boundaries else []
+
+        if partitioning == "range":
+            if len(self.boundaries) != self.num_shards - 1:
+                raise ValueError("Range partitioning needs num_shards - 1 boundary keys")
+            if self.boundaries != sorted(self.boundaries):
+                raise ValueError("Range boundaries must be sorted")
+
+        self._connections = []
+        self._processes = []
+        for shard_id in range(self.num_shards):
+            parent_conn, child_conn = multiprocessing.Pipe()
+            process = multiprocessing.Process(
+                target=_shard_worker,
+                args=(child_conn, f"{wal_prefix}_{shard_id}.log", structure),
+                daemon=True
+            )
+            process.start()
+            child_conn.close()
+            self._connections.append(parent_conn)
+            self._processes.append(process)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def shard_for(self, key):
+        """Return the shard index that owns a key"""
+        str_key = str(key)
+        if self.partitioning == "range":
+            return bisect.bisect_right(self.boundaries, str_key)
+        # crc32 is stable across processes and restarts, unlike hash()
+        return zlib.crc32(str_key.encode("utf-8")) % self.num_shards
+
+    def _send_batches(self, batches):
+        """Send one batch per shard, then collect the replies"""
+        for shard_id, batch in batches.items():
+            self._connections[shard_id].send(batch)
+        return {shard_id: self._connections[shard_id].recv() for shard_id in batches}
+
+    def _unwrap(self, reply):
+        ok, result = reply
+        if not ok:
+            raise RuntimeError(f"Shard operation failed: {result}")
+        return result
+
+    def execute_batch(self, operations):
+        """
+        Run a list of (method, key, *args) operations, grouped into one
+        message per shard. Results are returned in input order.
+        """
+        batches = {}
+        positions = {}
+        for index, (method, key, *args) in enumerate(operations):
+            shard_id = self.shard_for(key)
+            batches.setdefault(shard_id, []).append((method, (str(key), *args)))
+            positions.setdefault(shard_id, []).append(index)
+
+        replies = self._send_batches(batches)
+
+        results = [None] * len(operations)
+        for shard_id, shard_replies in replies.items():
+            for index, reply in zip(positions[shard_id], shard_replies):
+                results[index] = self._unwrap(reply)
+        return results
+
+    def _broadcast(self, method, *args, shards=None):
+        """Run the same method on several shards and return their results by shard"""
+        shards = range(self.num_shards) if shards is None else shards
+        replies = self._send_batches({shard_id: [(method, args)] for shard_id in shards})
+        return {shard_id: self._unwrap(reply[0]) for shard_id, reply in replies.items()}
+
+    def insert(self, key, value):
+        return self.execute_batch([("insert", key, value)])[0]
+
+    def update(self, key, value):
+        return self.execute_batch([("update", key, value)])[0]
+
+    def delete(self, key):
+        return self.execute_batch([("delete", key)])[0]
+
+    def search(self, key):
+        return self.execute_batch([("search", key)])[0]
+
+    def insert_many(self, items):
+        """Insert an iterable of (key, value) pairs with one round trip per shard"""
+        self.execute_batch([("insert", key, value) for key, value in items])
+
+    def get_many(self, keys):
+        """Fan out a multi-key lookup and return the found (key, value) pairs in key order"""
+        by_shard = {}
+        for key in keys:
+            by_shard.setdefault(self.shard_for(key), []).append(str(key))
+
+        batches = {shard_id: [("get_many", (shard_keys,))] for shard_id, shard_keys in by_shard.items()}
+        replies = self._send_batches(batches)
+        return list(heapq.merge(*(self._unwrap(reply[0]) for reply in replies.values())))
+
+    def range_query(self, start_key=None, end_key=None):
+        """Return (key, value) pairs with start_key <= key <= end_key merged across shards"""
+        shards = None
+        if self.partitioning == "range":
+            # Only shards whose key range overlaps the query need to be asked
+            first = self.shard_for(start_key) if start_key is not None else 0
+            last = self.shard_for(end_key) if end_key is not None else self.num_shards - 1
+            shards = range(first, last + 1)
+
+        results = self._broadcast("range_query", start_key, end_key, shards=shards)
+        if self.partitioning == "range":
+            return [item for shard_id in sorted(results) for item in results[shard_id]]
+        return list(heapq.merge(*results.values()))
+
+    def get_all_data(self):
+        """Return all key-value pairs across shards in key order"""
+        return self.range_query()
+
+    def clear(self):
+        """Clear every shard"""
+        self._broadcast("clear")
+
+    def close(self):
+        """Stop the worker processes"""
+        for conn in self._connections:
+            try:
+                conn.send(None)
+                conn.close()
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self._processes:
+            process.join(timeout=5)
+        self._connections = []
+        self._processes = []
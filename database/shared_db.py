@@ -0,0 +1,196 @@
+import queue
+import threading
+from contextlib import contextmanager
+
+from database.in_memory_db import InMemoryDB
+
+
+class RWLock:
+    """
+    Readers-writer lock: any number of readers, or one writer. Waiting
+    writers hold off new readers so a steady stream of reads cannot
+    starve them.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._readers = 0
+        self._writer = False
+        self._waiting_writers = 0
+
+    def acquire_read(self):
+        with self._cond:
+            while self._writer or self._waiting_writers:
+                self._cond.wait()
+            self._readers += 1
+
+    def release_read(self):
+        with self._cond:
+            self._readers -= 1
+            if self._readers == 0:
+                self._cond.notify_all()
+
+    def acquire_write(self):
+        with self._cond:
+            self._waiting_writers += 1
+            while self._writer or self._readers:
+                self._cond.wait()
+            self._waiting_writers -= 1
+            self._writer = True
+
+    def release_write(self):
+        with self._cond:
+            self._writer = False
+            self._cond.notify_all()
+
+    def read(self):
+        return _Held(self.acquire_read, self.release_read)
+
+    def write(self):
+        return _Held(self.acquire_write, self.release_write)
+
+
+class _Held:
+    def __init__(self, acquire, release):
+        self._acquire = acquire
+        self._release = release
+
+    def __enter__(self):
+        self._acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self._release()
+
+
+class PendingWrite:
+    """A queued write; result() blocks until its batch has been fsynced"""
+
+    def __init__(self, operation, args):
+        self.operation = operation
+        self.args = args
+        self._done = threading.Event()
+        self._result = None
+        self._error = None
+
+    def _finish(self, result=None, error=None):
+        self._result = result
+        self._error = error
+        self._done.set()
+
+    def result(self, timeout=None):
+        if not self._done.wait(timeout):
+            raise TimeoutError(f"{self.operation} was not committed within {timeout}s")
+        if self._error is not None:
+            raise self._error
+        return self._result
+
+
+class SharedDB:
+    """
+    One InMemoryDB shared by every session of a process.
+
+    Reads run concurrently under the read side of a readers-writer lock.
+    insert, update and delete are queued to a single writer thread, which
+    applies whatever has queued up (up to max_batch writes) under the write
+    lock inside one group commit, so the whole batch costs a single WAL
+    write and fsync. Callers get their result once the batch is on disk.
+
+    Transactions and other writes that change the engine as a whole
+    (structure switches, imports, clear, ...) run directly under the write
+    lock. Any other attribute is passed through to the engine; methods run
+    under the read lock.
+    """
+    QUEUED = ("insert", "update", "delete")
+    EXCLUSIVE = (
+        "set_structure", "bulk_insert", "import_csv", "load_snapshot", "checkpoint",
+        "freeze", "clear", "enable_bloom_filter", "disable_bloom_filter", "apply_wal_records",
+        # Reads that update shared state: the visualization cache, the column
+        # store merged on demand and the step counters attached to indexes
+        "get_current_visualization", "aggregate", "explain",
+    )
+
+    def __init__(self, db=None, max_batch=256, **db_kwargs):
+        self.db = db if db is not None else InMemoryDB(**db_kwargs)
+        self.lock = RWLock()
+        self.max_batch = max_batch
+        self.batches = 0
+        self.batched_writes = 0
+        self._queue = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer.start()
+
+    def submit(self, operation, *args):
+        """Queue a write without waiting for it; returns a PendingWrite"""
+        if operation not in self.QUEUED:
+            raise ValueError(f"Unsupported queued write: {operation}")
+        pending = PendingWrite(operation, args)
+        self._queue.put(pending)
+        return pending
+
+    def insert(self, key, value):
+        return self.submit("insert", key, value).result()
+
+    def update(self, key, value):
+        return self.submit("update", key, value).result()
+
+    def delete(self, key):
+        return self.submit("delete", key).result()
+
+    @contextmanager
+    def transaction(self):
+        """
+        InMemoryDB.transaction() holding the write lock for the whole block,
+        so the commit is logged with its own fsync and applied with no reader
+        or queued write in between. Read through tx inside the block; calls
+        on this SharedDB would wait for the lock.
+        """
+        with self.lock.write(), self.db.transaction() as tx:
+            yield tx
+
+    def _write_loop(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._apply(batch)
+
+    def _apply(self, batch):
+        outcomes = []
+        try:
+            with self.lock.write(), self.db.group_commit():
+                for pending in batch:
+                    try:
+                        outcomes.append((getattr(self.db, pending.operation)(*pending.args), None))
+                    except Exception as e:
+                        outcomes.append((None, e))
+        except Exception as e:
+            print(f"Error committing write batch: {e}")
+            outcomes += [(None, e)] * (len(batch) - len(outcomes))
+        self.batches += 1
+        self.batched_writes += len(batch)
+        # Only now, with the batch fsynced, are the writes acknowledged
+        for pending, (result, error) in zip(batch, outcomes):
+            pending._finish(result, error)
+
+    def get_writer_stats(self):
+        return {
+            "batches": self.batches,
+            "writes": self.batched_writes,
+            "avg_batch": self.batched_writes / self.batches if self.batches else 0,
+            "queued": self._queue.qsize(),
+        }
+
+    def __getattr__(self, name):
+        attr = getattr(self.db, name)
+        if not callable(attr):
+            return attr
+        lock = self.lock.write if name in self.EXCLUSIVE else self.lock.read
+
+        def locked(*args, **kwargs):
+            with lock():
+                return attr(*args, **kwargs)
+        return locked
@@ -0,0 +1,88 @@
+import csv
+import io
+import itertools
+import json
+
+
+def page_items(structure, after_key=None, size=50):
+    """
+    Return one page of (key, value) pairs from an ordered index, starting
+    after after_key, plus the cursor for the next page (None on the last page).
+    """
+    after_key = str(after_key) if after_key is not None else None
+    items = structure.range_query(after_key, None)
+    if after_key is not None:
+        items = itertools.dropwhile(lambda item: item[0] == after_key, items)
+
+    page = list(itertools.islice(items, size + 1))
+    next_cursor = page[size - 1][0] if len(page) > size else None
+    return page[:size], next_cursor
+
+
+def iter_export_items(items, fmt="csv", chunksize=1000):
+    """Yield (key, value) pairs as CSV or JSON Lines text chunks"""
+    if fmt not in ("csv", "jsonl"):
+        raise ValueError(f"Unsupported export format: {fmt}")
+
+    if fmt == "csv":
+        yield "Key,Value\r\n"
+
+    while True:
+        batch = list(itertools.islice(items, chunksize))
+        if not batch:
+            return
+        if fmt == "csv":
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows(batch)
+            yield buffer.getvalue()
+        else:
+            yield "".join(json.dumps({"key": k, "value": v}) + "\n" for k, v in batch)
+
+
+class Snapshot:
+    """
+    Read-only, point-in-time view of an InMemoryDB. It keeps its own root of
+    the persistent index, so it stays consistent while the database goes on
+    taking writes, and its version is freed once the snapshot is dropped.
+    """
+
+    def __init__(self, structure, version, sequence, size):
+        self._structure = structure
+        # Database version and last WAL sequence number the view reflects
+        self.version = version
+        self.sequence = sequence
+        self.size = size
+
+    def __len__(self):
+        return self.size
+
+    def search(self, key):
+        return self._structure.search(str(key))
+
+    def get_many(self, keys):
+        """Look up several keys at once, returning (key, value) pairs for the keys found, in key order"""
+        results = []
+        for key in sorted(set(str(k) for k in keys)):
+            value = self._structure.search(key)
+            if value is not None:
+                results.append((key, value))
+        return results
+
+    def range_query(self, start_key=None, end_key=None):
+        """Yield (key, value) pairs with start_key <= key <= end_key in key order"""
+        start_key = str(start_key) if start_key is not None else None
+        end_key = str(end_key) if end_key is not None else None
+        return self._structure.range_query(start_key, end_key)
+
+    def page(self, after_key=None, size=50):
+        return page_items(self._structure, after_key, size)
+
+    def iter_export(self, fmt="csv", chunksize=1000):
+        return iter_export_items(self._structure.range_query(), fmt, chunksize)
+
+    def export(self, stream, fmt="csv", chunksize=1000):
+        for chunk in self.iter_export(fmt, chunksize):
+            stream.write(chunk)
+
+    def get_all_data(self):
+        return dict(self._structure.range_query())
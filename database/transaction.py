@@ -0,0 +1,71 @@
+_DELETED = object()
+
+
+class Transaction:
+    """
+    Buffered writes for InMemoryDB.transaction().
+
+    Reads inside the transaction see its own pending writes; other readers see
+    none of them until commit, when they are logged and applied together.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self.operations = []
+        self.pending = {}
+        self.closed = False
+
+    def _check_open(self):
+        if self.closed:
+            raise RuntimeError("Transaction is already committed or rolled back")
+
+    def _exists(self, str_key):
+        if str_key in self.pending:
+            return self.pending[str_key] is not _DELETED
+        return str_key in self.db.data
+
+    def search(self, key):
+        """Look up a key, including writes made earlier in this transaction"""
+        str_key = str(key)
+        if str_key in self.pending:
+            value = self.pending[str_key]
+            return None if value is _DELETED else value
+        return self.db.data.get(str_key)
+
+    def insert(self, key, value):
+        self._check_open()
+        str_key = str(key)
+        str_value = str(value) if not isinstance(value, str) else value
+        self.operations.append(("insert", str_key, str_value))
+        self.pending[str_key] = str_value
+
+    def update(self, key, value):
+        """Buffer an update; returns False if the key does not exist"""
+        self._check_open()
+        str_key = str(key)
+        if not self._exists(str_key):
+            return False
+        str_value = str(value) if not isinstance(value, str) else value
+        self.operations.append(("update", str_key, str_value))
+        self.pending[str_key] = str_value
+        return True
+
+    def delete(self, key):
+        """Buffer a delete; returns False if the key does not exist"""
+        self._check_open()
+        str_key = str(key)
+        if not self._exists(str_key):
+            return False
+        self.operations.append(("delete", str_key, None))
+        self.pending[str_key] = _DELETED
+        return True
+
+    def commit(self):
+        self._check_open()
+        self.closed = True
+        self.db._commit_transaction(self.operations)
+
+    def rollback(self):
+        self.closed = True
+        self.operations = []
+        self.pending = {}
@@ -1,11 +1,64 @@
 import json
 import os
+import shutil
+import time
+from collections import deque
+from contextlib import contextmanager
 from datetime import datetime
 
+# The active file is sealed into a numbered segment once it reaches this size
+DEFAULT_SEGMENT_SIZE = 4 * 1024 * 1024
+
+
+def decode_segment(path, after_seq=0):
+    """Decode one WAL file, keeping records after after_seq (run in worker processes on recovery)"""
+    records = []
+    try:
+        with open(path, "r") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    print(f"Skipping corrupted WAL entry: {line}")
+                    continue
+                # Records written before sequence numbers existed are always kept
+                if record.get("seq", after_seq + 1) > after_seq:
+                    records.append(record)
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        print(f"Error reading WAL file {path}: {e}")
+    return records
+
+
 class WAL:
-    def __init__(self, filename="wal.log"):
+    """
+    Write-ahead log. Records are appended to the active file (filename);
+    when it reaches segment_size bytes it is sealed into a numbered segment
+    (filename.000001, ...) listed, with its last sequence number, in the
+    manifest (filename.manifest). Segments fully covered by a checkpoint
+    are deleted, or moved to archive_dir when one is given.
+
+    A read_only WAL never creates, repairs or writes any file, so readers
+    such as a replica can open the primary's log safely.
+    """
+
+    def __init__(self, filename="wal.log", segment_size=DEFAULT_SEGMENT_SIZE, archive_dir=None, read_only=False):
         self.filename = filename
-        self._ensure_wal_file()
+        self.checkpoint_filename = filename + ".checkpoint"
+        self.manifest_filename = filename + ".manifest"
+        self.segment_size = segment_size
+        self.archive_dir = archive_dir
+        self.read_only = read_only
+        # Nanoseconds spent in each phase of the most recent append
+        self.last_timings = {"wal_encode": 0, "wal_write": 0, "fsync": 0}
+        # Encoded records held back by batch(), or None when appends are written at once
+        self._pending = None
+        if not read_only:
+            self._ensure_wal_file()
+        self.sequence = max(self.read_last_sequence(), self.read_checkpoint_sequence())
 
     def _ensure_wal_file(self):
         """Ensure WAL file exists and is writable"""
@@ -15,38 +68,336 @@ class WAL:
                     pass  # Create empty file
             except Exception as e:
                 print(f"Error creating WAL file: {e}")
+        else:
+            self._terminate_torn_record()
+
+    def _terminate_torn_record(self):
+        """End a record left half-written by a crash so new records start on their own line"""
+        try:
+            with open(self.filename, "rb+") as f:
+                f.seek(0, os.SEEK_END)
+                if f.tell() == 0:
+                    return
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    f.write(b"\n")
+        except Exception as e:
+            print(f"Error repairing WAL file {self.filename}: {e}")
 
     def log_operation(self, operation, key, value):
         """Log an operation to the WAL file"""
+        self.sequence += 1
         entry = {
+            "seq": self.sequence,
             "timestamp": datetime.now().isoformat(),
             "operation": operation,
             "key": key,
             "value": value
         }
+        self._append(entry)
+
+    def log_transaction(self, operations):
+        """
+        Log a committed transaction as a single record with a single fsync.
+        A record that was only partly written cannot be decoded, so recovery
+        drops transactions that never finished committing.
+        """
+        self.sequence += 1
+        entry = {
+            "seq": self.sequence,
+            "timestamp": datetime.now().isoformat(),
+            "operation": "transaction",
+            "key": None,
+            "value": None,
+            "operations": [
+                {"operation": operation, "key": key, "value": value}
+                for operation, key, value in operations
+            ]
+        }
+        self._append(entry)
+
+    def _check_writable(self):
+        if self.read_only:
+            raise RuntimeError(f"WAL {self.filename} is opened read-only")
 
+    def _append(self, entry):
+        self._check_writable()
+        start = time.perf_counter_ns()
+        line = json.dumps(entry) + "\n"
+        encoded = time.perf_counter_ns()
+        if self._pending is not None:
+            # Written by batch() on exit; the write and fsync are shared by the batch
+            self._pending.append(line)
+            self.last_timings = {"wal_encode": encoded - start, "wal_write": 0, "fsync": 0}
+            return
+        self._write(line, start, encoded)
+
+    def _write(self, data, start, encoded):
+        written = synced = encoded
+        size = 0
         try:
             with open(self.filename, "a") as f:
-                f.write(json.dumps(entry) + "\n")
+                f.write(data)
                 f.flush()  # Ensure write is committed to disk
+                written = time.perf_counter_ns()
                 os.fsync(f.fileno())  # Force OS to write to disk
+                synced = time.perf_counter_ns()
+                size = f.tell()
         except Exception as e:
                 print(f"Error writing to WAL file {self.filename}: {e}")
+        self.last_timings = {
+            "wal_encode": encoded - start,
+            "wal_write": written - encoded,
+            "fsync": synced - written
+        }
+        if size >= self.segment_size:
+            self._rotate()
 
+    @contextmanager
+    def batch(self):
+        """
+        Group commit: records appended inside the block are written with a
+        single write and a single fsync when it exits, so they become
+        durable together at the end of the block.
+        """
+        if self._pending is not None:
+            yield
+            return
+        self._pending = []
+        try:
+            yield
+        finally:
+            lines, self._pending = self._pending, None
+            if lines:
+                now = time.perf_counter_ns()
+                self._write("".join(lines), now, now)
 
-    def recover(self):
-        """Recover operations from the WAL file"""
-        operations = []
-        if os.path.exists(self.filename):
+    def _segment_path(self, name):
+        return os.path.join(os.path.dirname(self.filename), name)
+
+    def read_manifest(self):
+        """
+        Return the manifest: {"next_id": n, "generation": g, "segments":
+        [{"id", "file", "last_seq"}, ...]}. The generation is bumped every
+        time the active file is truncated.
+        """
+        if not os.path.exists(self.manifest_filename):
+            return {"next_id": 1, "generation": 0, "segments": []}
+        try:
+            with open(self.manifest_filename, "r") as f:
+                manifest = json.load(f)
+        except Exception as e:
+            print(f"Error reading WAL manifest {self.manifest_filename}: {e}")
+            return {"next_id": 1, "generation": 0, "segments": []}
+        manifest.setdefault("generation", 0)
+        return manifest
+
+    def generation(self):
+        return self.read_manifest()["generation"]
+
+    def _truncate_active(self):
+        """Empty the active file and bump the generation so tailing readers start over"""
+        with open(self.filename, "w") as f:
+            f.truncate(0)
+        manifest = self.read_manifest()
+        manifest["generation"] += 1
+        self._write_manifest(manifest)
+
+    def _write_manifest(self, manifest):
+        temp_filename = self.manifest_filename + ".tmp"
+        with open(temp_filename, "w") as f:
+            json.dump(manifest, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_filename, self.manifest_filename)
+
+    def segments(self):
+        """Sealed segments that exist on disk, oldest first"""
+        return [
+            segment for segment in self.read_manifest()["segments"]
+            if os.path.exists(self._segment_path(segment["file"]))
+        ]
+
+    def _rotate(self):
+        """Seal the active file into the next numbered segment and start a new active file"""
+        try:
+            manifest = self.read_manifest()
+            segment = {
+                "id": manifest["next_id"],
+                "file": f"{os.path.basename(self.filename)}.{manifest['next_id']:06d}",
+                "last_seq": self.sequence
+            }
+            # Listed before the rename: an entry whose file is missing is ignored,
+            # and its records are then still in the active file
+            manifest["segments"].append(segment)
+            manifest["next_id"] += 1
+            self._write_manifest(manifest)
+            os.replace(self.filename, self._segment_path(segment["file"]))
+            with open(self.filename, "w"):
+                pass
+        except Exception as e:
+            print(f"Error rotating WAL file {self.filename}: {e}")
+
+    def _drop_segments(self, up_to_seq):
+        """Delete (or archive) sealed segments whose records are all at or before up_to_seq"""
+        manifest = self.read_manifest()
+        keep = []
+        for segment in manifest["segments"]:
+            if segment["last_seq"] > up_to_seq:
+                keep.append(segment)
+                continue
+            path = self._segment_path(segment["file"])
             try:
-                with open(self.filename, "r") as f:
-                    for line in f:
-                        try:
-                            operation = json.loads(line.strip())
-                            operations.append(operation)
-                        except json.JSONDecodeError:
-                            print(f"Skipping corrupted WAL entry: {line}")
-                            continue
+                if not os.path.exists(path):
+                    continue
+                if self.archive_dir:
+                    os.makedirs(self.archive_dir, exist_ok=True)
+                    shutil.move(path, os.path.join(self.archive_dir, segment["file"]))
+                else:
+                    os.remove(path)
             except Exception as e:
-                print(f"Error reading WAL file {self.filename}: {e}")
-        return operations
+                print(f"Error removing WAL segment {path}: {e}")
+                keep.append(segment)
+        if len(keep) != len(manifest["segments"]):
+            manifest["segments"] = keep
+            self._write_manifest(manifest)
+
+    @staticmethod
+    def expand(records):
+        """Flatten transaction records into the individual operations they contain"""
+        for record in records:
+            if record["operation"] == "transaction":
+                for operation in record["operations"]:
+                    yield operation
+            else:
+                yield record
+
+    def recover(self):
+        """Recover operations from the WAL segments and active file"""
+        return list(self.iter_records())
+
+    def iter_records(self, after_seq=0, workers=None):
+        """
+        Stream the records after after_seq in sequence order, one segment at
+        a time. With several segments and workers > 1, segments are decoded
+        in worker processes a window ahead of the caller, so at most about
+        `workers` decoded segments are held in memory at once.
+        """
+        paths = [
+            self._segment_path(segment["file"]) for segment in self.segments()
+            if segment["last_seq"] > after_seq
+        ]
+        paths.append(self.filename)
+
+        workers = workers or 1
+        if workers <= 1 or len(paths) <= 2:
+            for path in paths:
+                yield from decode_segment(path, after_seq)
+            return
+
+        # Imported here: the process pool machinery is costly to import and only
+        # needed to recover a long log
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            window = deque()
+            for path in paths:
+                window.append(executor.submit(decode_segment, path, after_seq))
+                if len(window) > workers:
+                    yield from window.popleft().result()
+            while window:
+                yield from window.popleft().result()
+
+    def read_last_sequence(self):
+        """Return the sequence number of the last record in the WAL"""
+        segments = self.read_manifest()["segments"]
+        sealed_seq = segments[-1]["last_seq"] if segments else 0
+        return max(self._read_active_last_sequence(), sealed_seq)
+
+    def _read_active_last_sequence(self):
+        if not os.path.exists(self.filename):
+            return 0
+        try:
+            with open(self.filename, "rb") as f:
+                # Read backwards in blocks until the last complete line is in memory
+                f.seek(0, os.SEEK_END)
+                position = f.tell()
+                tail = b""
+                while position > 0 and b"\n" not in tail.rstrip(b"\n"):
+                    step = min(4096, position)
+                    position -= step
+                    f.seek(position)
+                    tail = f.read(step) + tail
+
+            for line in reversed(tail.splitlines()):
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if "seq" in record:
+                    return record["seq"]
+                # Records written before sequence numbers existed
+                return self._count_records()
+        except Exception as e:
+            print(f"Error reading WAL file {self.filename}: {e}")
+        return 0
+
+    def _count_records(self):
+        with open(self.filename, "rb") as f:
+            return sum(1 for line in f if line.strip())
+
+    def read_checkpoint(self):
+        """Return the checkpoint snapshot ({"seq", "timestamp", "data"}), or None"""
+        if not os.path.exists(self.checkpoint_filename):
+            return None
+        try:
+            with open(self.checkpoint_filename, "r") as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"Error reading checkpoint file {self.checkpoint_filename}: {e}")
+            return None
+
+    def read_checkpoint_sequence(self):
+        checkpoint = self.read_checkpoint()
+        return checkpoint["seq"] if checkpoint else 0
+
+    def write_checkpoint(self, data, truncate=True, sequence=None):
+        """
+        Write a snapshot of the data at the given sequence number (the
+        current one by default). Records up to that sequence are then covered
+        by the snapshot, so unless truncate is False the segments holding
+        only such records are dropped, and the active file is truncated if
+        no records past the snapshot were appended in the meantime.
+        """
+        self._check_writable()
+        checkpoint = {
+            "seq": self.sequence if sequence is None else sequence,
+            "timestamp": datetime.now().isoformat(),
+            "data": data
+        }
+        temp_filename = self.checkpoint_filename + ".tmp"
+        try:
+            with open(temp_filename, "w") as f:
+                json.dump(checkpoint, f)
+                f.flush()
+                os.fsync(f.fileno())
+            # Atomic swap so readers never see a half-written snapshot
+            os.replace(temp_filename, self.checkpoint_filename)
+            if truncate:
+                self._drop_segments(checkpoint["seq"])
+            if truncate and checkpoint["seq"] == self.sequence:
+                self._truncate_active()
+        except Exception as e:
+            print(f"Error writing checkpoint file {self.checkpoint_filename}: {e}")
+        return checkpoint["seq"]
+
+    def reset(self):
+        """Discard the WAL contents and checkpoint, keeping the sequence counter monotonic"""
+        self._check_writable()
+        try:
+            self._drop_segments(self.sequence)
+            self._truncate_active()
+            if os.path.exists(self.checkpoint_filename):
+                os.remove(self.checkpoint_filename)
+        except Exception as e:
+            print(f"Error clearing WAL file: {e}")
@@ -0,0 +1,32 @@
+from database.columns import NumericColumns
+from database.in_memory_db import InMemoryDB
+
+
+def test_keys_longer_than_existing_keys_are_not_truncated(tmp_path):
+    db = InMemoryDB(wal_filename=str(tmp_path / "wal.log"))
+    # Builds the column store while it is still empty
+    assert db.aggregate(op="count") == 0
+    db.insert("apple", 10)
+    db.insert("banana", 20)
+    db.delete("banana")
+    assert db.aggregate(op="sum") == 10.0
+    assert list(db._columns.keys) == ["apple"]
+    db.insert("cherry-pie", 5)
+    assert db.aggregate(op="sum", key_range=("b", "cherry-pie")) == 5.0
+
+
+def test_staged_writes_match_a_rebuild():
+    items = [(f"k{i}", str(i)) for i in range(0, 100, 3)]
+    columns = NumericColumns.from_items(sorted(items))
+    expected = dict(items)
+    for i in range(0, 100, 5):
+        key = f"k{i}" * (1 + i % 3)
+        columns.stage(key, str(i * 2))
+        expected[key] = str(i * 2)
+    for i in range(0, 100, 9):
+        columns.stage(f"k{i}", None)
+        expected.pop(f"k{i}", None)
+    rebuilt = NumericColumns.from_items(sorted(expected.items()))
+    for op in ("count", "sum", "min", "max"):
+        assert columns.aggregate(op=op, key_range=("k1", "k5")) == rebuilt.aggregate(op=op, key_range=("k1", "k5"))
+    assert list(columns.keys) == list(rebuilt.keys)
@@ -0,0 +1,63 @@
+import math
+
+import pytest
+
+from data_structures.avl_tree import AVLTree
+from data_structures.op_counter import OpCounter
+from database.in_memory_db import InMemoryDB, STRUCTURE_NAMES, TOMBSTONE_STRUCTURES
+
+
+def loaded_db(tmp_path, n):
+    db = InMemoryDB(wal_filename=str(tmp_path / f"wal-{n}.log"))
+    db.bulk_insert([(f"k{i:06d}", str(i)) for i in range(n)])
+    return db
+
+
+def total_steps(counts):
+    return sum(counts[field] for field in OpCounter.FIELDS)
+
+
+@pytest.mark.parametrize("op", ["search", "insert"])
+def test_costs_grow_logarithmically(tmp_path, op):
+    small = loaded_db(tmp_path, 1000).explain(op, "k000123", 1, structures=list(STRUCTURE_NAMES))
+    large = loaded_db(tmp_path, 16000).explain(op, "k000123", 1, structures=list(STRUCTURE_NAMES))
+    for structure in STRUCTURE_NAMES:
+        # 16x the keys: a linear-time regression would show up as ~16x the steps
+        assert total_steps(large[structure]) <= 2.5 * max(total_steps(small[structure]), 1), structure
+        assert total_steps(large[structure]) <= 8 * math.log2(16000), structure
+
+
+def test_explain_leaves_the_data_and_index_untouched(tmp_path):
+    db = loaded_db(tmp_path, 100)
+    data = dict(db.data)
+    version = db.version
+    db.explain("insert", "new", "value", structures=list(STRUCTURE_NAMES))
+    db.explain("delete", "k000001", structures=list(STRUCTURE_NAMES))
+    db.explain("search", "k000001")
+    assert db.data == data
+    assert db.version == version
+    assert db.search("new") is None
+    assert db.btree.counter is None
+
+
+def test_delete_reports_rebuilt_keys(tmp_path):
+    db = loaded_db(tmp_path, 100)
+    result = db.explain("delete", "k000001", structures=list(STRUCTURE_NAMES))
+    for structure, counts in result.items():
+        expected = 0 if structure in TOMBSTONE_STRUCTURES else 99
+        assert counts["rebuilt_keys"] == expected, structure
+
+
+def test_avl_inserts_count_rotations():
+    tree = AVLTree()
+    tree.counter = OpCounter()
+    for i in range(100):
+        tree.insert(f"k{i:03d}", i)
+    # Ascending inserts rebalance at every power of two
+    assert tree.counter.rotations >= 90
+    assert tree.counter.comparisons < 100 * 2 * math.log2(100)
+
+
+def test_unsupported_operation_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        loaded_db(tmp_path, 10).explain("scan", "k")
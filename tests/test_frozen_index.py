@@ -0,0 +1,21 @@
+from data_structures.frozen_index import FrozenIndex
+
+
+def test_frozen_index_delta_shadows_the_arrays():
+    index = FrozenIndex()
+    index.bulk_load([(f"k{i:03d}", str(i)) for i in range(0, 100, 2)])
+    index.insert("k001", "new")
+    index.insert("k002", "changed")
+    index.delete("k004")
+    expected = {f"k{i:03d}": str(i) for i in range(0, 100, 2)}
+    expected.update({"k001": "new", "k002": "changed"})
+    del expected["k004"]
+
+    assert index.search("k004") is None
+    assert index.search("k002") == "changed"
+    assert list(index.range_query()) == sorted(expected.items())
+    assert list(index.range_query("k001", "k010")) == [item for item in sorted(expected.items()) if "k001" <= item[0] <= "k010"]
+
+    merged = index.merged()
+    assert merged.delta == {}
+    assert list(merged.range_query()) == sorted(expected.items())
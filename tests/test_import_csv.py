@@ -0,0 +1,18 @@
+import io
+
+from database.in_memory_db import InMemoryDB
+
+
+def test_rows_are_stored_as_json_objects(tmp_path):
+    db = InMemoryDB(wal_filename=str(tmp_path / "wal.log"))
+    rows = db.import_csv(io.BytesIO(b"id,name,score\nb,Bob,2\na,Ann,1\nb,Ben,3\n"), chunksize=2)
+    assert rows == 3
+    assert db.get_all_data() == [("a", '{"name":"Ann","score":1}'), ("b", '{"name":"Ben","score":3}')]
+    assert InMemoryDB(wal_filename=str(tmp_path / "wal.log")).data == db.data
+
+
+def test_key_only_csv_stores_empty_objects(tmp_path):
+    db = InMemoryDB(wal_filename=str(tmp_path / "wal.log"))
+    assert db.import_csv(io.BytesIO(b"id\nx\ny\n")) == 2
+    assert db.data == {"x": "{}", "y": "{}"}
+    assert db.search("y") == "{}"
@@ -0,0 +1,15 @@
+import pytest
+
+from database.in_memory_db import InMemoryDB, STRUCTURE_NAMES
+
+
+@pytest.mark.parametrize("structure", list(STRUCTURE_NAMES))
+def test_update_stores_strings_in_every_index(tmp_path, structure):
+    db = InMemoryDB(wal_filename=str(tmp_path / "wal.log"))
+    db.set_structure(structure, visualize=False)
+    db.insert(5, 6)
+    db.insert("a", "b")
+    assert db.update(5, 7)
+    assert db.page(None, 10) == ([("5", "7"), ("a", "b")], None)
+    assert db.search(5) == "7"
+    assert InMemoryDB(wal_filename=str(tmp_path / "wal.log")).data == {"5": "7", "a": "b"}
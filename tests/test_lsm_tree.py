@@ -0,0 +1,66 @@
+import math
+import random
+
+from data_structures.lsm_tree import LSMTree, SortedRun
+
+
+def test_reads_match_a_dict_across_flushes_and_compactions():
+    rng = random.Random(7)
+    tree = LSMTree(memtable_size=16, tier_fanout=2, background=False)
+    expected = {}
+    for _ in range(2000):
+        key = f"k{rng.randrange(500):03d}"
+        if rng.random() < 0.2:
+            tree.delete(key)
+            expected.pop(key, None)
+        else:
+            tree.insert(key, str(rng.random()))
+            expected[key] = tree.search(key)
+    assert tree.compactions > 0
+    for i in range(500):
+        assert tree.search(f"k{i:03d}") == expected.get(f"k{i:03d}")
+    assert list(tree.range_query()) == sorted(expected.items())
+    assert list(tree.range_query("k100", "k199")) == [
+        item for item in sorted(expected.items()) if "k100" <= item[0] <= "k199"
+    ]
+
+
+def test_bounded_scan_reads_only_the_range():
+    tree = LSMTree()
+    tree.bulk_load([(f"k{i:05d}", str(i)) for i in range(10000)])
+    scan = tree.range_query("k05000")
+    assert next(scan) == ("k05000", "5000")
+    assert next(scan) == ("k05001", "5001")
+
+
+def assert_log_bounded(tree, keys):
+    tiers = [tree._tier(run) for run in tree.runs]
+    assert tiers == sorted(tiers)
+    # At most tier_fanout - 1 runs wait in each tier
+    levels = math.ceil(math.log(max(keys / tree.memtable_size, 1), tree.tier_fanout)) + 1
+    assert len(tree.runs) <= (tree.tier_fanout - 1) * levels
+
+
+def test_background_compaction_keeps_runs_log_bounded():
+    rng = random.Random(11)
+    tree = LSMTree(memtable_size=64, tier_fanout=4, background=True)
+    for _ in range(50000):
+        tree.insert(f"k{rng.randrange(10 ** 9):09d}", "v")
+    tree.wait_for_compaction()
+    assert_log_bounded(tree, 50000)
+
+
+def test_compaction_repairs_interleaved_tiers():
+    tree = LSMTree(memtable_size=16, tier_fanout=4, background=False)
+    # Newest first: a large merged run above smaller, older ones
+    sizes = [16, 1024, 32, 900, 48, 700, 16]
+    expected = {}
+    start = 0
+    for size in sizes:
+        items = [(f"k{i:06d}", str(i)) for i in range(start, start + size)]
+        tree.runs.append(SortedRun(items))
+        expected.update(items)
+        start += size // 2
+    tree.compact()
+    assert_log_bounded(tree, sum(sizes))
+    assert len(list(tree.range_query())) == len(expected)
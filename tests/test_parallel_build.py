@@ -0,0 +1,30 @@
+import database.in_memory_db as in_memory_db
+from database.in_memory_db import InMemoryDB
+from database.parallel_build import prepare_sorted_items
+
+
+def test_parallel_and_serial_builds_agree():
+    data = {f"k{i * 7919 % 5000:04d}": str(i) for i in range(5000)}
+    serial, _ = prepare_sorted_items(data)
+    parallel, levels = prepare_sorted_items(data, workers=2, threshold=0, skip_list_p=0.5)
+    assert serial == parallel == sorted(data.items())
+    assert len(levels) == len(data)
+
+
+def test_only_whole_index_rebuilds_use_workers(tmp_path, monkeypatch):
+    db = InMemoryDB(wal_filename=str(tmp_path / "wal.log"), build_workers=4)
+    db.insert("a", 1)
+    db.insert("b", 2)
+
+    calls = []
+
+    def record(data, workers=None, **kwargs):
+        calls.append(workers)
+        return prepare_sorted_items(data, workers=1, **kwargs)
+
+    monkeypatch.setattr(in_memory_db, "prepare_sorted_items", record)
+    db.delete("a")
+    db.apply_wal_records([{"operation": "delete", "key": "b", "value": None}])
+    assert calls == [1, 1]
+    db.set_structure("avl", visualize=False)
+    assert calls[-1] == 4
@@ -0,0 +1,39 @@
+import random
+
+from data_structures.radix_tree import AdaptiveRadixTree
+
+WORDS = ["", "a", "ab", "abc", "abd", "b", "ba", "car", "card", "care", "cart", "é", "éa", "z" * 40]
+
+
+def random_items(rng, count):
+    keys = {rng.choice(WORDS) + str(rng.randrange(1000)) for _ in range(count)} | set(WORDS)
+    return {key: str(rng.random()) for key in keys}
+
+
+def test_radix_tree_matches_a_dict():
+    rng = random.Random(3)
+    structure = AdaptiveRadixTree()
+    expected = {}
+    for key, value in random_items(rng, 2000).items():
+        structure.insert(key, value)
+        expected[key] = value
+    for key in rng.sample(sorted(expected), 200):
+        structure.insert(key, "updated")
+        expected[key] = "updated"
+
+    for key, value in expected.items():
+        assert structure.search(key) == value
+    assert structure.search("missing-key") is None
+    assert list(structure.range_query()) == sorted(expected.items())
+    assert list(structure.range_query("b", "card")) == [item for item in sorted(expected.items()) if "b" <= item[0] <= "card"]
+
+
+def test_radix_tree_prefix_scan_and_node_growth():
+    tree = AdaptiveRadixTree()
+    items = {f"p{chr(c)}{i}": str(i) for c in range(40, 140) for i in range(3)}
+    tree.bulk_load(sorted(items.items()))
+    assert tree.size == len(items)
+    assert list(tree.prefix_scan("pA")) == sorted(item for item in items.items() if item[0].startswith("pA"))
+    assert list(tree.prefix_scan("q")) == []
+    # 100 distinct bytes after "p" force the node there to grow past 48 children
+    assert type(tree.root).__name__ == "Node256"
@@ -0,0 +1,30 @@
+import random
+
+import pytest
+
+from data_structures.avl_tree import AVLTree
+from data_structures.btree import BPlusTree
+from data_structures.skip_list import SkipList
+
+
+@pytest.mark.parametrize("make", [lambda: BPlusTree(order=4), AVLTree, SkipList])
+def test_inserts_and_scans_match_a_dict(make):
+    rng = random.Random(3)
+    structure = make()
+    expected = {}
+    for _ in range(2000):
+        key = f"k{rng.randrange(1500):04d}"
+        structure.insert(key, str(rng.random()))
+        expected[key] = structure.search(key)
+    # Updates replace the value rather than adding a second entry
+    for key in rng.sample(sorted(expected), 200):
+        structure.insert(key, "updated")
+        expected[key] = "updated"
+
+    for key, value in expected.items():
+        assert structure.search(key) == value
+    assert structure.search("missing-key") is None
+    assert list(structure.range_query()) == sorted(expected.items())
+    assert list(structure.range_query("k0100", "k0199")) == [
+        item for item in sorted(expected.items()) if "k0100" <= item[0] <= "k0199"
+    ]
@@ -0,0 +1,140 @@
+import time
+
+import pytest
+
+from database.in_memory_db import InMemoryDB
+from database.replication import WALFollower
+from database.wal import WAL
+
+
+def make_pair(tmp_path):
+    wal_filename = str(tmp_path / "wal.log")
+    primary = InMemoryDB(wal_filename=wal_filename)
+    follower = WALFollower(wal_filename=wal_filename, replica_wal_filename=str(tmp_path / "replica.log"))
+    return primary, follower
+
+
+def insert_keys(db, start, stop):
+    for i in range(start, stop):
+        db.insert(f"k{i:03d}", f"v{i}")
+
+
+def test_follower_applies_new_records(tmp_path):
+    primary, follower = make_pair(tmp_path)
+    insert_keys(primary, 0, 10)
+    primary.delete("k003")
+    follower.poll()
+    assert follower.db.data == primary.data
+    assert follower.replication_lag()["ops"] == 0
+
+
+def test_lag_ms_is_age_of_oldest_unapplied_record(tmp_path):
+    primary, follower = make_pair(tmp_path)
+    insert_keys(primary, 0, 5)
+    follower.poll()
+    # An idle primary does not make the caught-up replica look stale
+    time.sleep(0.3)
+    assert follower.replication_lag()["ms"] == 0.0
+    written = time.time()
+    insert_keys(primary, 5, 6)
+    assert follower.replication_lag()["ms"] <= (time.time() - written) * 1000 + 1
+    time.sleep(0.1)
+    lag = follower.replication_lag()
+    assert lag["ops"] == 1
+    assert lag["ms"] >= 100
+
+
+def test_lag_ms_after_rotation(tmp_path):
+    primary, follower = make_pair(tmp_path)
+    primary.wal.segment_size = 512
+    insert_keys(primary, 0, 5)
+    follower.poll()
+    time.sleep(0.1)
+    # The next unapplied record is sealed in a segment, not in the active file
+    written = time.time()
+    insert_keys(primary, 5, 40)
+    assert primary.wal.segments()
+    assert 0 < follower.replication_lag()["ms"] <= (time.time() - written) * 1000 + 1
+
+
+def test_checkpoint_then_longer_rewrite_between_polls(tmp_path):
+    primary, follower = make_pair(tmp_path)
+    insert_keys(primary, 0, 20)
+    follower.poll()
+    # The truncated file grows past the follower's old read offset before the next poll
+    primary.checkpoint()
+    insert_keys(primary, 20, 40)
+    follower.poll()
+    assert follower.db.data == primary.data
+    assert follower.applied_seq == primary.wal.sequence
+    assert follower.replication_lag()["ops"] == 0
+
+
+def test_rewrite_detected_without_generation_change(tmp_path):
+    primary, follower = make_pair(tmp_path)
+    insert_keys(primary, 0, 20)
+    follower.poll()
+    # Hide the truncation from the generation check
+    follower.primary_wal.generation = lambda: follower._generation
+    primary.checkpoint()
+    insert_keys(primary, 20, 40)
+    follower.poll()
+    assert follower.db.data == primary.data
+    assert follower.replication_lag()["ops"] == 0
+
+
+def test_sequence_gap_rereads_from_start(tmp_path):
+    primary, follower = make_pair(tmp_path)
+    insert_keys(primary, 0, 20)
+    follower.poll()
+    follower.primary_wal.generation = lambda: follower._generation
+    primary.checkpoint()
+    insert_keys(primary, 20, 40)
+    # Leave the follower at a record boundary part-way through the rewritten file
+    with open(primary.wal.filename, "rb") as f:
+        follower._offset = len(b"".join(f.readlines()[:10]))
+    follower.poll()
+    assert follower.db.data == primary.data
+    assert follower.replication_lag()["ops"] == 0
+
+
+def test_follower_across_rotation(tmp_path):
+    primary, follower = make_pair(tmp_path)
+    primary.wal.segment_size = 512
+    insert_keys(primary, 0, 10)
+    follower.poll()
+    insert_keys(primary, 10, 40)
+    assert primary.wal.segments()
+    follower.poll()
+    assert follower.db.data == primary.data
+
+
+def test_follower_opens_primary_wal_read_only(tmp_path):
+    wal_path = tmp_path / "wal.log"
+    WALFollower(wal_filename=str(wal_path), replica_wal_filename=str(tmp_path / "replica.log"))
+    assert not wal_path.exists()
+
+    # A record still being written must not be terminated by the follower
+    wal_path.write_bytes(b'{"seq": 1, "operation": "ins')
+    follower = WALFollower(wal_filename=str(wal_path), replica_wal_filename=str(tmp_path / "replica.log"))
+    assert wal_path.read_bytes() == b'{"seq": 1, "operation": "ins'
+    assert follower.poll() == 0
+
+
+def test_sequence_numbers_survive_checkpoint_and_restart(tmp_path):
+    wal_filename = str(tmp_path / "wal.log")
+    db = InMemoryDB(wal_filename=wal_filename)
+    for i in range(5):
+        db.insert(i, i)
+    db.checkpoint()
+    db.insert("x", "y")
+    reopened = InMemoryDB(wal_filename=wal_filename)
+    assert reopened.wal.sequence == db.wal.sequence == 6
+    assert reopened.data == db.data
+
+
+def test_read_only_wal_refuses_writes(tmp_path):
+    wal = WAL(str(tmp_path / "wal.log"), read_only=True)
+    with pytest.raises(RuntimeError):
+        wal.log_operation("insert", "a", "1")
+    assert not (tmp_path / "wal.log").exists()
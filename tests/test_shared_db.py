@@ -0,0 +1,82 @@
+import json
+import threading
+
+from database.in_memory_db import InMemoryDB
+from database.shared_db import SharedDB
+from database.wal import WAL
+
+
+def test_concurrent_writes_are_batched_and_durable(tmp_path):
+    wal_filename = str(tmp_path / "wal.log")
+    shared = SharedDB(wal_filename=wal_filename)
+
+    def write(thread):
+        for i in range(50):
+            shared.insert(f"t{thread}-{i:02d}", i)
+            assert shared.search(f"t{thread}-{i:02d}") == str(i)
+        for i in range(0, 50, 2):
+            assert shared.delete(f"t{thread}-{i:02d}")
+
+    threads = [threading.Thread(target=write, args=(t,)) for t in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(shared.data) == 100
+    assert shared.get_writer_stats()["writes"] == 300
+    assert InMemoryDB(wal_filename=wal_filename).data == shared.data
+
+
+def test_transaction_holds_the_write_lock_until_committed(tmp_path):
+    wal_filename = str(tmp_path / "wal.log")
+    shared = SharedDB(wal_filename=wal_filename)
+    shared.insert("a", 1)
+
+    with shared.transaction() as tx:
+        pending = shared.submit("insert", "b", 2)
+        tx.insert("c", 3)
+        tx.delete("a")
+        # The queued write cannot run while the transaction holds the lock
+        assert not pending._done.wait(0.05)
+    pending.result(timeout=5)
+
+    assert shared.data == {"b": "2", "c": "3"}
+    assert InMemoryDB(wal_filename=wal_filename).data == shared.data
+
+
+def test_aggregate_runs_under_the_write_lock(tmp_path):
+    shared = SharedDB(wal_filename=str(tmp_path / "wal.log"))
+    shared.insert("apple", 10)
+    assert shared.aggregate(op="sum") == 10.0
+    shared.insert("banana", 20)
+
+    shared.lock.acquire_read()
+    finished = threading.Event()
+    thread = threading.Thread(target=lambda: (shared.aggregate(op="sum"), finished.set()))
+    thread.start()
+    assert not finished.wait(0.05)
+    shared.lock.release_read()
+    thread.join(5)
+    assert finished.is_set()
+    assert shared.aggregate(op="sum") == 30.0
+
+
+def test_batched_writes_are_charged_the_batch_fsync(tmp_path):
+    shared = SharedDB(wal_filename=str(tmp_path / "wal.log"))
+    for i in range(20):
+        shared.insert(f"k{i}", i)
+    samples = shared.phase_metrics["btree"]["insert"]
+    assert len(samples) == 20
+    assert all(sample["fsync"] > 0 for sample in samples)
+    assert shared.get_phase_breakdown()["btree"]["insert"]["fsync"] > 0
+
+
+def test_wal_batch_writes_its_records_together(tmp_path):
+    wal = WAL(str(tmp_path / "wal.log"))
+    with wal.batch():
+        wal.log_operation("insert", "a", "1")
+        wal.log_operation("insert", "b", "2")
+        assert open(wal.filename).read() == ""
+    with open(wal.filename) as f:
+        assert [json.loads(line)["key"] for line in f] == ["a", "b"]
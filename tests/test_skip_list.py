@@ -0,0 +1,43 @@
+import random
+
+from data_structures.op_counter import OpCounter
+from data_structures.skip_list import SkipList
+
+
+def test_skip_list_matches_a_dict_in_any_insert_order():
+    rng = random.Random(5)
+    keys = list(range(3000))
+    orders = [keys, keys[::-1], rng.sample(keys, len(keys))]
+    # Runs that step backwards and forwards around the previous key
+    orders.append([base + offset for base in range(0, 3000, 10) for offset in (5, 3, 9, 0, 7, 1, 8, 2, 6, 4)])
+    for order in orders:
+        structure = SkipList(seed=1)
+        expected = {}
+        for key in order:
+            structure.insert(key, f"v{key}")
+            expected[key] = f"v{key}"
+        for key in rng.sample(keys, 300):
+            structure.insert(key, "updated")
+            expected[key] = "updated"
+
+        assert list(structure.range_query()) == sorted(expected.items())
+        for key in rng.sample(keys, 300):
+            assert structure.search(key) == expected[key]
+
+
+def test_backward_finger_makes_descending_inserts_cheap():
+    structure = SkipList(seed=2)
+    structure.bulk_load([(key, key) for key in range(0, 200000, 2)])
+    structure.counter = OpCounter()
+    for key in range(150001, 149001, -2):
+        structure.insert(key, key)
+    near_finger = structure.counter.comparisons
+
+    # The same inserts without the finger search from the header every time
+    structure = SkipList(seed=2)
+    structure.bulk_load([(key, key) for key in range(0, 200000, 2)])
+    structure.counter = OpCounter()
+    for key in range(150001, 149001, -2):
+        structure._finger_key = None
+        structure.insert(key, key)
+    assert near_finger * 2 < structure.counter.comparisons
@@ -0,0 +1,37 @@
+import pytest
+
+from data_structures.avl_tree import AVLTree
+from data_structures.btree import BPlusTree
+from database.in_memory_db import InMemoryDB, STRUCTURE_NAMES
+
+
+@pytest.mark.parametrize("make", [lambda: BPlusTree(order=4), AVLTree])
+def test_persistent_tree_snapshots_are_isolated(make):
+    tree = make()
+    tree.bulk_load([(f"k{i:03d}", "old") for i in range(200)])
+    snapshot = tree.snapshot()
+    for i in range(0, 300, 3):
+        tree.insert(f"k{i:03d}", "new")
+
+    assert list(snapshot.range_query()) == [(f"k{i:03d}", "old") for i in range(200)]
+    assert tree.search("k003") == "new"
+    assert snapshot.search("k003") == "old"
+    assert snapshot.search("k201") is None
+
+
+@pytest.mark.parametrize("structure", list(STRUCTURE_NAMES))
+def test_snapshot_is_unaffected_by_later_writes(tmp_path, structure):
+    db = InMemoryDB(wal_filename=str(tmp_path / "wal.log"))
+    db.set_structure(structure, visualize=False)
+    for i in range(50):
+        db.insert(f"k{i:02d}", i)
+    snapshot = db.snapshot()
+    db.insert("k00", "changed")
+    db.insert("new", 1)
+    db.delete("k01")
+
+    assert len(snapshot) == 50
+    assert snapshot.search("k00") == "0"
+    assert snapshot.search("k01") == "1"
+    assert snapshot.search("new") is None
+    assert list(snapshot.range_query()) == [(f"k{i:02d}", str(i)) for i in range(50)]
@@ -0,0 +1,55 @@
+import json
+
+import pytest
+
+from database.in_memory_db import InMemoryDB
+
+
+def read_records(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def test_transaction_is_logged_as_one_record(tmp_path):
+    wal_filename = str(tmp_path / "wal.log")
+    db = InMemoryDB(wal_filename=wal_filename)
+    db.insert("a", 1)
+    with db.transaction() as tx:
+        tx.insert("b", 2)
+        tx.update("a", 3)
+        tx.delete("b")
+    records = read_records(wal_filename)
+    assert [record["operation"] for record in records] == ["insert", "transaction"]
+    assert len(records[1]["operations"]) == 3
+    assert InMemoryDB(wal_filename=wal_filename).data == db.data == {"a": "3"}
+
+
+def test_rolled_back_transaction_logs_nothing(tmp_path):
+    wal_filename = str(tmp_path / "wal.log")
+    db = InMemoryDB(wal_filename=wal_filename)
+    with pytest.raises(RuntimeError):
+        with db.transaction() as tx:
+            tx.insert("a", 1)
+            raise RuntimeError("abort")
+    assert db.data == {}
+    assert read_records(wal_filename) == []
+
+
+def test_torn_transaction_is_dropped_on_recovery(tmp_path):
+    wal_filename = str(tmp_path / "wal.log")
+    db = InMemoryDB(wal_filename=wal_filename)
+    db.insert("a", 1)
+    with db.transaction() as tx:
+        tx.insert("b", 2)
+        tx.insert("c", 3)
+    # Cut the transaction record off part-way, as a crash during the write would
+    with open(wal_filename, "rb") as f:
+        contents = f.read()
+    with open(wal_filename, "wb") as f:
+        f.write(contents[:-20])
+
+    recovered = InMemoryDB(wal_filename=wal_filename)
+    assert recovered.data == {"a": "1"}
+    # New records start on their own line after the torn one
+    recovered.insert("d", 4)
+    assert InMemoryDB(wal_filename=wal_filename).data == {"a": "1", "d": "4"}
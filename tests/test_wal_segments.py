@@ -0,0 +1,37 @@
+from database.in_memory_db import InMemoryDB
+
+
+def test_rotation_and_recovery_across_segments(tmp_path):
+    wal_filename = str(tmp_path / "wal.log")
+    db = InMemoryDB(wal_filename=wal_filename)
+    db.wal.segment_size = 1024
+    for i in range(200):
+        db.insert(f"k{i:03d}", i)
+    for i in range(0, 200, 4):
+        db.delete(f"k{i:03d}")
+
+    segments = db.wal.segments()
+    assert len(segments) > 2
+    assert [segment["id"] for segment in segments] == sorted(segment["id"] for segment in segments)
+    assert InMemoryDB(wal_filename=wal_filename).data == db.data
+
+    records = list(db.wal.iter_records())
+    assert [record["seq"] for record in records] == list(range(1, db.wal.sequence + 1))
+    assert list(db.wal.iter_records(workers=2)) == records
+    assert [record["seq"] for record in db.wal.iter_records(after_seq=100)] == list(range(101, db.wal.sequence + 1))
+
+
+def test_checkpoint_drops_or_archives_covered_segments(tmp_path):
+    wal_filename = str(tmp_path / "wal.log")
+    db = InMemoryDB(wal_filename=wal_filename)
+    db.wal.segment_size = 1024
+    db.wal.archive_dir = str(tmp_path / "archive")
+    for i in range(100):
+        db.insert(f"k{i:03d}", i)
+    sealed = [segment["file"] for segment in db.wal.segments()]
+    assert sealed
+
+    db.checkpoint()
+    assert db.wal.segments() == []
+    assert sorted(path.name for path in (tmp_path / "archive").iterdir()) == sealed
+    assert InMemoryDB(wal_filename=wal_filename).data == db.data
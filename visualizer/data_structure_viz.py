@@ -1,91 +1,266 @@
+import itertools
 import graphviz
-import streamlit as st
+from collections import OrderedDict
 
 class DataStructureVisualizer:
-    def __init__(self):
+    def __init__(self, max_depth=4, max_nodes=150, count_limit=10000, cache_size=8):
         self.colors = {
             "node": "#FF4B4B",
             "highlight": "#00CC96",
-            "edge": "#262730"
+            "edge": "#262730",
+            "collapsed": "#808495"
         }
+        # Rendering limits: only the top max_depth levels (and at most
+        # max_nodes nodes) are drawn; everything below is collapsed
+        self.max_depth = max_depth
+        self.max_nodes = max_nodes
+        # Counting keys under a collapsed subtree stops at this many
+        self.count_limit = count_limit
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
 
-    def _create_btree_graph(self, node, graph, parent_name=None, edge_label=None):
+    def _short(self, value, width=20):
+        text = str(value)
+        return text if len(text) <= width else text[:width - 1] + "…"
+
+    def _format_count(self, count):
+        return f"{self.count_limit:,}+" if count >= self.count_limit else f"{count:,}"
+
+    def _add_collapsed(self, graph, parent_name, node_id, count, edge_label=None):
+        node_name = f"collapsed_{node_id}"
+        graph.node(node_name, f"… {self._format_count(count)} keys", shape="box",
+                   style="dashed", color=self.colors["collapsed"])
+        graph.edge(parent_name, node_name, edge_label or "", color=self.colors["edge"], style="dashed")
+
+    def _count_btree_keys(self, node, limit):
+        """Count keys stored in the leaves under node, stopping once limit is reached"""
+        count = 0
+        stack = [node]
+        while stack and count < limit:
+            current = stack.pop()
+            if current.leaf:
+                count += len(current.keys)
+            else:
+                stack.extend(current.children)
+        return min(count, limit)
+
+    def _create_btree_graph(self, node, graph, parent_name=None, edge_label=None, depth=0, budget=None):
         if not node:
             return
+        budget = budget if budget is not None else [self.max_nodes]
 
         # Create node name
         node_name = f"node_{id(node)}"
-        
+
+        # Collapse the subtree once the depth or node budget is used up
+        if parent_name and (depth >= self.max_depth or budget[0] <= 0):
+            self._add_collapsed(graph, parent_name, id(node),
+                                self._count_btree_keys(node, self.count_limit), edge_label)
+            return
+        budget[0] -= 1
+
         # Create label with key-value pairs
         if node.leaf:
-            label = " | ".join([f"{k[0]}: {k[1]}" for k in node.keys])
+            label = " | ".join([f"{self._short(k[0])}: {self._short(k[1])}" for k in node.keys])
         else:
-            label = " | ".join([str(k[0]) for k in node.keys])
-            
+            label = " | ".join([self._short(k[0]) for k in node.keys])
+
         graph.node(node_name, label, shape="record", color=self.colors["node"])
-        
+
         if parent_name:
             graph.edge(parent_name, node_name, edge_label or "", color=self.colors["edge"])
-            
+
         if not node.leaf:
             for i, child in enumerate(node.children):
-                self._create_btree_graph(child, graph, node_name, str(i))
+                self._create_btree_graph(child, graph, node_name, str(i), depth + 1, budget)
 
-    def _create_avl_graph(self, node, graph, parent_name=None):
+    def _count_avl_keys(self, node, limit):
+        """Count nodes in an AVL subtree, stopping once limit is reached"""
+        count = 0
+        stack = [node]
+        while stack and count < limit:
+            current = stack.pop()
+            if current:
+                count += 1
+                stack.append(current.left)
+                stack.append(current.right)
+        return min(count, limit)
+
+    def _create_avl_graph(self, node, graph, parent_name=None, depth=0, budget=None):
         if not node:
             return
+        budget = budget if budget is not None else [self.max_nodes]
+
+        if parent_name and (depth >= self.max_depth or budget[0] <= 0):
+            self._add_collapsed(graph, parent_name, id(node), self._count_avl_keys(node, self.count_limit))
+            return
+        budget[0] -= 1
 
         node_name = f"node_{id(node)}"
-        label = f"{node.key}: {node.value}\\nh={node.height}"
+        label = f"{self._short(node.key)}: {self._short(node.value)}\\nh={node.height}"
         graph.node(node_name, label, color=self.colors["node"])
-        
+
         if parent_name:
             graph.edge(parent_name, node_name, color=self.colors["edge"])
-            
-        self._create_avl_graph(node.left, graph, node_name)
-        self._create_avl_graph(node.right, graph, node_name)
+
+        self._create_avl_graph(node.left, graph, node_name, depth + 1, budget)
+        self._create_avl_graph(node.right, graph, node_name, depth + 1, budget)
 
     def _create_skiplist_graph(self, skip_list, graph):
         current = skip_list.header
         level = skip_list.level
-        
+
         # Create header node
         header_name = "header"
         graph.node(header_name, "Header", color=self.colors["node"])
-        
+
         # Create nodes for each level
         prev_nodes = {i: header_name for i in range(level + 1)}
-        
+
+        drawn = 0
         while current.forward[0]:
+            if drawn >= self.max_nodes:
+                # Summarize the rest of the list as a single node
+                remaining = 0
+                while current.forward[0] and remaining < self.count_limit:
+                    current = current.forward[0]
+                    remaining += 1
+                self._add_collapsed(graph, prev_nodes[0], "skip_list_tail", remaining)
+                return
+
             current = current.forward[0]
+            drawn += 1
             node_name = f"node_{id(current)}"
-            label = f"{current.key}: {current.value}"
+            label = f"{self._short(current.key)}: {self._short(current.value)}"
             graph.node(node_name, label, color=self.colors["node"])
-            
+
             # Add edges for each level
             for i in range(min(current.forward.__len__(), level + 1)):
                 if current.forward[i]:
                     graph.edge(prev_nodes[i], node_name, color=self.colors["edge"], constraint='false')
                 prev_nodes[i] = node_name
 
-    def visualize_structure(self, structure_type, structure, title):
-        """Generate visualization for a specific data structure"""
+    def _count_art_keys(self, node, limit):
+        """Count leaves under a radix tree node, stopping once limit is reached"""
+        count = 0
+        stack = [node]
+        while stack and count < limit:
+            current = stack.pop()
+            if not hasattr(current, "prefix"):
+                count += 1
+                continue
+            if current.terminal is not None:
+                count += 1
+            stack.extend(child for _, child in current.items())
+        return min(count, limit)
+
+    def _create_art_graph(self, node, graph, parent_name=None, edge_label=None, depth=0, budget=None):
+        if node is None:
+            return
+        budget = budget if budget is not None else [self.max_nodes]
+
+        if parent_name and (depth >= self.max_depth or budget[0] <= 0):
+            self._add_collapsed(graph, parent_name, id(node), self._count_art_keys(node, self.count_limit), edge_label)
+            return
+        budget[0] -= 1
+
+        node_name = f"node_{id(node)}"
+        if not hasattr(node, "prefix"):
+            # Leaf
+            graph.node(node_name, f"{self._short(node.key)}: {self._short(node.value)}", color=self.colors["node"])
+        else:
+            label = type(node).__name__
+            if node.prefix:
+                label += f"\\nprefix: {self._short(node.prefix.decode('utf-8', errors='replace'))}"
+            if node.terminal is not None:
+                label += f"\\n= {self._short(node.terminal.value)}"
+            graph.node(node_name, label, shape="box", color=self.colors["node"])
+
+        if parent_name:
+            graph.edge(parent_name, node_name, edge_label or "", color=self.colors["edge"])
+
+        if hasattr(node, "prefix"):
+            for byte, child in node.items():
+                label = chr(byte) if 32 < byte < 127 else f"0x{byte:02x}"
+                self._create_art_graph(child, graph, node_name, label, depth + 1, budget)
+
+    def _create_frozen_graph(self, frozen_index, graph, blocks=8):
+        keys = frozen_index.keys
+        # The sorted array, summarized as a few equal slices with their key spans
+        previous = None
+        step = max(-(-len(keys) // blocks), 1)
+        for index, start in enumerate(range(0, len(keys), step)):
+            end = min(start + step, len(keys)) - 1
+            node_name = f"block_{index}"
+            label = f"[{start:,} … {end:,}]\\n{self._short(keys[start])} … {self._short(keys[end])}"
+            graph.node(node_name, label, shape="box", color=self.colors["node"])
+            if previous:
+                graph.edge(previous, node_name, color=self.colors["edge"])
+            previous = node_name
+
+        delta = frozen_index.delta
+        if delta:
+            tombstones = sum(1 for value in delta.values() if not isinstance(value, str))
+            graph.node("delta", f"Delta\\n{len(delta):,} writes\\n({tombstones:,} deletes)",
+                       shape="box", color=self.colors["highlight"])
+
+    def _create_lsm_graph(self, lsm_tree, graph):
+        memtable = lsm_tree.memtable
+        preview = [self._short(key) for key, _ in itertools.islice(memtable.range_query(), 3)]
+        label = f"Memtable\\n{memtable.size:,} keys"
+        if preview:
+            label += "\\n" + ", ".join(preview) + (" …" if memtable.size > len(preview) else "")
+        graph.node("memtable", label, shape="box", color=self.colors["highlight"])
+
+        # Runs newest first, each summarized by its size and key span
+        previous = "memtable"
+        for index, run in enumerate(lsm_tree.runs[:self.max_nodes]):
+            node_name = f"run_{index}"
+            label = f"Run {index}\\n{len(run):,} keys"
+            if len(run):
+                label += f"\\n{self._short(run.keys[0])} … {self._short(run.keys[-1])}"
+            graph.node(node_name, label, shape="box", color=self.colors["node"])
+            graph.edge(previous, node_name, color=self.colors["edge"])
+            previous = node_name
+
+    def visualize_structure(self, structure_type, structure, title, version=None):
+        """
+        Generate visualization for a specific data structure.
+        When a version is given, the graph is cached and reused until the
+        structure's version changes.
+        """
+        cache_key = (structure_type, id(structure), version)
+        if version is not None and cache_key in self._cache:
+            self._cache.move_to_end(cache_key)
+            return self._cache[cache_key]
+
         graph = graphviz.Digraph()
-        graph.attr(rankdir='LR' if structure_type == "skip_list" else "TB")
-        
+        graph.attr(rankdir='LR' if structure_type in ("skip_list", "lsm", "frozen") else "TB")
+
         if structure_type == "btree":
             self._create_btree_graph(structure.root, graph)
         elif structure_type == "avl":
             self._create_avl_graph(structure.root, graph)
+        elif structure_type == "lsm":
+            self._create_lsm_graph(structure, graph)
+        elif structure_type == "art":
+            self._create_art_graph(structure.root, graph)
+        elif structure_type == "frozen":
+            self._create_frozen_graph(structure, graph)
         else:  # skip_list
             self._create_skiplist_graph(structure, graph)
-            
+
+        if version is not None:
+            self._cache[cache_key] = graph
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
         return graph
 
-    def create_transition_animation(self, source_structure, target_structure, source_type, target_type):
+    def create_transition_animation(self, source_structure, target_structure, source_type, target_type,
+                                    source_version=None, target_version=None):
         """Create animation frames for structure transition"""
         # Generate before and after visualizations
-        source_graph = self.visualize_structure(source_type, source_structure, "Before")
-        target_graph = self.visualize_structure(target_type, target_structure, "After")
-        
+        source_graph = self.visualize_structure(source_type, source_structure, "Before", source_version)
+        target_graph = self.visualize_structure(target_type, target_structure, "After", target_version)
+
         return source_graph, target_graph